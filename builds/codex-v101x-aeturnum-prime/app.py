@@ -1,19 +1,53 @@
 from fastapi import FastAPI, HTTPException, Header, Request
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
-import json, os, time, hmac, hashlib, base64, random
-from codex.aeturnum.holonous import compile_glyphs
+from contextlib import asynccontextmanager
+import json, os, time, hmac, hashlib, base64, random, asyncio, logging
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+from codex.aeturnum.holonous import compile_glyphs, compile_many
 from codex.aeturnum.chronomerkl import ChronoMerkle
+from codex.aeturnum.ledger import Ledger
 from codex.redact import scrub_obj
+from codex.policy import PolicyStore
 
 APP_VER = "Codex Aeturnum v101.x · Prime"
 SUBJECT = "caleb fedor byker konev|1998-10-27"
 SUBJECT_SHA256 = "REPLACE_ME"
 
 TENANTS="tenants/config.json"; FLAGS="config/flags.json"
-GITHUB_WEBHOOK_SECRET = os.getenv("GITHUB_WEBHOOK_SECRET","dev-webhook")
+GITHUB_WEBHOOK_SECRET = os.getenv("GITHUB_WEBHOOK_SECRET","dev-webhook").encode()
+WEBHOOK_QUEUE_MAX = int(os.getenv("CODEX_WEBHOOK_QUEUE","1024")); WEBHOOK_BATCH = 256
+log = logging.getLogger("codex.aeturnum")
 
-chrono = ChronoMerkle()
-app = FastAPI(title=APP_VER)
+chrono = ChronoMerkle(os.getenv("CODEX_CHRONO_DIR"))  # unset: ephemeral temp dir
+ledger = Ledger("codex/aeturnum/ledger.jsonl")
+policies = PolicyStore()  # compiled per tenant, reloaded when tenants/config.json or a set changes
+webhook_q: asyncio.Queue = asyncio.Queue(WEBHOOK_QUEUE_MAX)
+
+def _record_webhooks(batch):
+    # runs off the event loop: redaction + one chrono segment write/fsync per batch
+    chrono.add_many([{**meta, "payload": scrub_obj(payload)} for meta, payload in batch])
+
+async def _webhook_worker():
+    while True:
+        batch = [await webhook_q.get()]
+        while len(batch) < WEBHOOK_BATCH and not webhook_q.empty(): batch.append(webhook_q.get_nowait())
+        try: await asyncio.to_thread(_record_webhooks, batch)
+        except Exception: log.exception("dropped %d webhook deliveries", len(batch))
+        finally:
+            for _ in batch: webhook_q.task_done()
+
+@asynccontextmanager
+async def lifespan(app):
+    worker = asyncio.create_task(_webhook_worker())
+    yield
+    await webhook_q.join()  # record every acknowledged delivery before exiting
+    worker.cancel()
+
+app = FastAPI(title=APP_VER, lifespan=lifespan)
 
 class GlyphReq(BaseModel):
     glyph: str
@@ -23,7 +57,7 @@ class GlyphReq(BaseModel):
 
 @app.get("/health")
 def health():
-    return {"ok":True,"ver":APP_VER,"subject_sha256":SUBJECT_SHA256,"flags":json.load(open(FLAGS))}
+    return {"ok":True,"ver":APP_VER,"subject_sha256":SUBJECT_SHA256,"flags":json.load(open(FLAGS)),"webhook_queue":webhook_q.qsize()}
 
 @app.get("/seal")
 def seal(): return {"subject": SUBJECT, "subject_id_sha256": SUBJECT_SHA256}
@@ -39,6 +73,18 @@ def openapi_signed():
     sig = base64.urlsafe_b64encode(hmac.new(key, body, hashlib.sha256).digest()).decode().rstrip("=")
     return {"sig": sig, "spec": spec}
 
+class PolicyPlanReq(BaseModel):
+    steps: list[str | dict] | None = None
+    glyph: str | None = None
+    tenant: str | None = None
+    attrs: dict = {}
+
+@app.post("/policy/evaluate")
+def policy_evaluate(req: PolicyPlanReq):
+    # whole run plan in one call: explicit steps, or the steps a glyph string compiles to
+    steps = req.steps if req.steps is not None else compile_glyphs(req.glyph or "")["steps"]
+    return {"tenant":req.tenant, **policies.evaluate_plan(req.tenant, steps, req.attrs)}
+
 @app.post("/holonous/compile")
 def holonous_compile(req: GlyphReq):
     res=compile_glyphs(req.glyph)
@@ -47,25 +93,57 @@ def holonous_compile(req: GlyphReq):
     chrono.add({"event":"compile","steps":res["steps"],"dry_run":req.dry_run,"tenant":req.tenant,"channel":req.channel})
     return {"ok":True,"steps":res["steps"],"explain":res["explain"],"chrono_root":chrono.head()}
 
+class GlyphBatchReq(BaseModel):
+    glyphs: list[str]
+    tenant: str | None = None
+    channel: str | None = "stable"
+    dry_run: bool = True
+
+@app.post("/holonous/compile:batch")
+def holonous_compile_batch(req: GlyphBatchReq):
+    results=compile_many(req.glyphs)
+    events=[{"event":"compile","steps":r["steps"],"dry_run":req.dry_run,"tenant":req.tenant,"channel":req.channel} for r in results if r["ok"]]
+    if events: chrono.add_many(events)  # one segment write + fsync for the whole batch
+    return {"ok":all(r["ok"] for r in results),"results":results,"chrono_root":chrono.head()}
+
+@app.get("/aeturnum/chrono/proof")
+def aeturnum_chrono_proof(index: int, size: int | None = None):
+    size = len(chrono) if size is None else size
+    if not 0 <= index < size <= len(chrono):
+        raise HTTPException(404, {"error":"no such entry","entries":len(chrono)})
+    return {"index":index,"size":size,"entry":chrono.entry(index),"leaf":chrono.leaf_hash(index),
+            "root":chrono.root(size),"proof":chrono.inclusion_proof(index, size)}
+
+@app.get("/aeturnum/chrono/consistency")
+def aeturnum_chrono_consistency(old: int, size: int | None = None):
+    size = len(chrono) if size is None else size
+    if not 0 < old <= size <= len(chrono):
+        raise HTTPException(404, {"error":"bad range","entries":len(chrono)})
+    return {"old":old,"size":size,"old_root":chrono.root(old),"root":chrono.root(size),"proof":chrono.consistency_proof(old, size)}
+
 @app.get("/aeturnum/ledger")
 def aeturnum_ledger():
-    lines=open("codex/aeturnum/ledger.jsonl").read().strip().splitlines()
-    return {"entries": len(lines), "head_preview": lines[-1] if lines else None}
+    return {"entries": len(ledger), "head_preview": ledger.tail()}
 
 @app.get("/aeturnum/query")
-def aeturnum_query(q: str = ""):
-    lines=open("codex/aeturnum/ledger.jsonl").read().strip().splitlines()
-    hits=[ln for ln in lines if q in ln][:50]
-    return {"q":q,"count":len(hits),"hits":hits}
+def aeturnum_query(q: str = "", limit: int = 50, cursor: int | None = None):
+    # q: space-separated terms, all must match; "field:value" scopes a term (dotted paths for nesting)
+    hits, next_cursor = ledger.query(q, limit=max(1, min(limit, 500)), cursor=cursor)
+    return {"q":q,"count":len(hits),"hits":hits,"next_cursor":next_cursor}
 
-@app.post("/webhook/github")
+@app.post("/webhook/github", status_code=202)
 async def webhook_github(request: Request):
-    sig = request.headers.get("X-Hub-Signature-256",
-    "")
     body = await request.body()
-    mac = hmac.new(GITHUB_WEBHOOK_SECRET.encode(), body, hashlib.sha256).hexdigest()
-    expect = "sha256="+mac
+    sig = request.headers.get("X-Hub-Signature-256","").encode()
+    expect = b"sha256=" + hmac.new(GITHUB_WEBHOOK_SECRET, body, hashlib.sha256).hexdigest().encode()
     if not hmac.compare_digest(expect, sig):
         raise HTTPException(401, {"error":"bad webhook signature"})
-    payload = await request.json()
-    return {"ok":True,"redacted": scrub_obj(payload)}
+    try: payload = json_loads(body)  # parsed once, from the bytes we verified
+    except ValueError: raise HTTPException(400, {"error":"body is not JSON"})
+    delivery = request.headers.get("X-GitHub-Delivery")
+    meta = {"event":"webhook","source":"github","gh_event":request.headers.get("X-GitHub-Event"),"delivery":delivery}
+    try: webhook_q.put_nowait((meta, payload))
+    except asyncio.QueueFull:
+        # GitHub redelivers on failure; shedding here beats timing out every delivery
+        return JSONResponse({"ok":False,"error":"webhook queue full"}, status_code=503, headers={"Retry-After":"5"})
+    return {"ok":True,"queued":True,"delivery":delivery}
@@ -1,9 +1,199 @@
-import hashlib, time, json
+"""ChronoMerkle — append-only event log under an RFC 6962-style Merkle tree.
+
+On-disk layout (one directory):
+  segment.jsonl   one canonical {"ts","info"} JSON line per event
+  offsets.u64     end offset of each line (8 bytes/entry, commit marker, written last)
+  level-KK.bin    32-byte hashes of every complete, aligned 2**K-leaf subtree (KK=00 are leaves)
+Only the frontier (the right-most pending node per level, <= 64 hashes) lives in memory.
+Any subtree needed by a proof is a single pread, so inclusion and consistency proofs are
+O(log n). add_many() writes a whole batch and fsyncs once.
+"""
+import hashlib, time, json, os, struct, tempfile, threading
+
+EMPTY = "0" * 64
+
+def _leaf(blob: bytes) -> bytes: return hashlib.sha256(b"\x00" + blob).digest()
+def _node(l: bytes, r: bytes) -> bytes: return hashlib.sha256(b"\x01" + l + r).digest()
+def _split(n: int) -> int: return 1 << ((n - 1).bit_length() - 1)  # largest power of two < n
+
 class ChronoMerkle:
-    def __init__(self): self.events=[]
-    def add(self, info:dict):
-        ts=time.time(); blob=json.dumps({'ts':ts,'info':info},separators=(',',':')).encode()
-        prev=self.events[-1]['root'] if self.events else '0'*64
-        h=hashlib.sha256(prev.encode()+blob).hexdigest()
-        self.events.append({'ts':ts,'root':h,'info':info}); return h
-    def head(self)->str: return self.events[-1]['root'] if self.events else '0'*64
+    def __init__(self, path: str | None = None, fsync: bool = True):
+        if path is None:  # ephemeral log (tests / dry runs); same bounded-memory behaviour
+            self._tmp = tempfile.TemporaryDirectory(prefix="chronomerkl-"); path = self._tmp.name
+        self.path, self.fsync = path, fsync
+        os.makedirs(path, exist_ok=True)
+        self._lock = threading.Lock()
+        self._open()
+
+    # ---------- storage ----------
+    def _open(self):
+        self._seg = open(os.path.join(self.path, "segment.jsonl"), "ab+")
+        self._off = open(os.path.join(self.path, "offsets.u64"), "ab+")
+        self._levels: list = []
+        self._recover()
+
+    def _reopen(self):
+        """After a failed write: drop buffered bytes and reload state from what is committed on disk."""
+        for f in [self._seg, self._off] + self._levels:
+            try: f.close()
+            except OSError: pass
+        self._open()
+
+    def _level(self, k: int):
+        while len(self._levels) <= k:
+            self._levels.append(open(os.path.join(self.path, f"level-{len(self._levels):02d}.bin"), "ab+"))
+        return self._levels[k]
+
+    def _recover(self):
+        # offsets.u64 is written last, so it defines how many entries are committed;
+        # anything past it in the other files is a torn batch and gets truncated
+        self.size = os.fstat(self._off.fileno()).st_size // 8
+        self._off.truncate(self.size * 8)
+        end = struct.unpack("<Q", os.pread(self._off.fileno(), 8, (self.size - 1) * 8))[0] if self.size else 0
+        self._seg.truncate(end); self._seg_end = end
+        k = 0
+        while os.path.exists(os.path.join(self.path, f"level-{k:02d}.bin")) or (self.size >> k):
+            self._level(k).truncate((self.size >> k) * 32); k += 1
+        self._frontier = {k: self._read(k, (self.size >> k) - 1) for k in range(self.size.bit_length()) if (self.size >> k) & 1}
+
+    def _read(self, k: int, i: int) -> bytes:
+        return os.pread(self._level(k).fileno(), 32, i * 32)
+
+    def _subtree(self, a: int, b: int) -> bytes:
+        """Merkle hash of leaves [a, b): aligned power-of-two ranges are a single lookup."""
+        n = b - a
+        if n & (n - 1) == 0 and a % n == 0:
+            return self._read(n.bit_length() - 1, a // n)
+        k = _split(n)
+        return _node(self._subtree(a, a + k), self._subtree(a + k, b))
+
+    # ---------- writes ----------
+    def add(self, info: dict) -> str:
+        return self.add_many([info])
+
+    def add_many(self, infos) -> str:
+        with self._lock:
+            # build the batch in locals; self only changes once the offsets (commit marker) are written
+            lines, ends, pending = [], [], {}
+            size, end, frontier = self.size, self._seg_end, dict(self._frontier)
+            for info in infos:
+                blob = json.dumps({"ts": time.time(), "info": info}, separators=(",", ":"), sort_keys=True).encode()
+                lines.append(blob + b"\n"); end += len(blob) + 1; ends.append(end)
+                h, k, i = _leaf(blob), 0, size
+                pending.setdefault(0, []).append(h)
+                while i & 1:  # close every subtree this leaf completes
+                    h = _node(frontier.pop(k), h); k += 1; i >>= 1
+                    pending.setdefault(k, []).append(h)
+                frontier[k] = h
+                size += 1
+            if not lines: return self._head()
+            try:
+                self._seg.write(b"".join(lines))
+                for k, hs in pending.items(): self._level(k).write(b"".join(hs))
+                files = [self._seg] + [self._level(k) for k in pending]
+                for f in files: f.flush()
+                if self.fsync:
+                    for f in files: os.fsync(f.fileno())
+                self._off.write(struct.pack(f"<{len(ends)}Q", *ends)); self._off.flush()
+            except BaseException:
+                self._reopen()  # truncates the torn batch, exactly as recovery on open would
+                raise
+            self.size, self._seg_end, self._frontier = size, end, frontier
+            if self.fsync: os.fsync(self._off.fileno())
+            return self._head()
+
+    # ---------- reads ----------
+    def __len__(self) -> int: return self.size
+
+    def _head(self) -> str:
+        if not self.size: return EMPTY
+        acc = None
+        for k in sorted(self._frontier):  # smallest subtree is right-most
+            acc = self._frontier[k] if acc is None else _node(self._frontier[k], acc)
+        return acc.hex()
+
+    def head(self) -> str:
+        with self._lock: return self._head()
+
+    def root(self, size: int | None = None) -> str:
+        with self._lock: return self._root(size)
+
+    def _root(self, size):
+        size = self.size if size is None else size
+        if not 0 <= size <= self.size: raise IndexError(size)
+        return self._subtree(0, size).hex() if size else EMPTY
+
+    def entry(self, i: int) -> dict:
+        with self._lock: return self._entry(i)
+
+    def _entry(self, i):
+        if not 0 <= i < self.size: raise IndexError(i)
+        start = struct.unpack("<Q", os.pread(self._off.fileno(), 8, (i - 1) * 8))[0] if i else 0
+        end = struct.unpack("<Q", os.pread(self._off.fileno(), 8, i * 8))[0]
+        return json.loads(os.pread(self._seg.fileno(), end - start, start))
+
+    def leaf_hash(self, i: int) -> str:
+        if not 0 <= i < self.size: raise IndexError(i)
+        return self._read(0, i).hex()
+
+    def inclusion_proof(self, i: int, size: int | None = None) -> list:
+        with self._lock: return self._inclusion(i, size)
+
+    def _inclusion(self, i, size):
+        size = self.size if size is None else size
+        if not 0 <= i < size <= self.size: raise IndexError(i)
+        proof, a, b = [], 0, size
+        while b - a > 1:
+            k = _split(b - a)
+            if i < a + k: proof.append(self._subtree(a + k, b)); b = a + k
+            else: proof.append(self._subtree(a, a + k)); a += k
+        return [h.hex() for h in reversed(proof)]
+
+    def consistency_proof(self, old: int, size: int | None = None) -> list:
+        with self._lock: return self._consistency(old, size)
+
+    def _consistency(self, old, size):
+        size = self.size if size is None else size
+        if not 0 < old <= size <= self.size: raise IndexError(old)
+        proof, a, b, m, complete = [], 0, size, old, True
+        while m != b - a:
+            k = _split(b - a)
+            if m <= k: proof.append(self._subtree(a + k, b)); b = a + k
+            else: proof.append(self._subtree(a, a + k)); a += k; m -= k; complete = False
+        if not complete: proof.append(self._subtree(a, b))
+        return [h.hex() for h in reversed(proof)]
+
+    # ---------- verification (RFC 9162 §2.1.3.2 / §2.1.4.2) ----------
+    @staticmethod
+    def verify_inclusion(leaf: str, i: int, size: int, proof: list, root: str) -> bool:
+        if not 0 <= i < size: return False
+        fn, sn, r = i, size - 1, bytes.fromhex(leaf)
+        for p in map(bytes.fromhex, proof):
+            if sn == 0: return False
+            if fn & 1 or fn == sn:
+                r = _node(p, r)
+                while not fn & 1 and fn: fn >>= 1; sn >>= 1
+            else: r = _node(r, p)
+            fn >>= 1; sn >>= 1
+        return sn == 0 and r.hex() == root
+
+    @staticmethod
+    def verify_consistency(old: int, size: int, old_root: str, root: str, proof: list) -> bool:
+        if old == size: return not proof and old_root == root
+        if not 0 < old < size or not proof: return False
+        proof = list(map(bytes.fromhex, proof))
+        if old & (old - 1) == 0: proof.insert(0, bytes.fromhex(old_root))
+        fn, sn = old - 1, size - 1
+        while fn & 1: fn >>= 1; sn >>= 1
+        fr = sr = proof[0]
+        for c in proof[1:]:
+            if sn == 0: return False
+            if fn & 1 or fn == sn:
+                fr, sr = _node(c, fr), _node(c, sr)
+                while not fn & 1 and fn: fn >>= 1; sn >>= 1
+            else: sr = _node(sr, c)
+            fn >>= 1; sn >>= 1
+        return sn == 0 and fr.hex() == old_root and sr.hex() == root
+
+    def close(self):
+        for f in [self._seg, self._off] + self._levels: f.close()
@@ -0,0 +1,132 @@
+"""Ledger engine for codex/aeturnum/ledger.jsonl.
+
+Keeps byte offsets of every line, a cached entry count / tail line, and an inverted
+index of  token -> [seq]  and  field:token -> [seq]  (nested keys flattened to dotted
+paths). Our own appends update the index immediately; lines appended by other writers
+are picked up by a cheap stat() check, indexing only the new bytes. A last line without
+a newline counts as an entry; if more bytes land on it, it is re-indexed. Queries intersect
+posting lists newest-first and page with an opaque cursor (the last seq returned).
+
+Query syntax: whitespace-separated terms, all of which must match.
+  deploy             token anywhere in the entry
+  event:compile      token in field "event" (dotted paths for nested keys: info.tenant:cfbk)
+"""
+import bisect, json, os, re, threading
+
+TOKEN = re.compile(r"[^\W_]+|[^\w\s]", re.UNICODE)  # words, plus single symbols/emoji
+
+def tokens(text) -> set:
+    return {t.lower() for t in TOKEN.findall(str(text))}
+
+def _fields(obj, prefix=""):
+    if isinstance(obj, dict):
+        for k, v in obj.items(): yield from _fields(v, f"{prefix}.{k}" if prefix else str(k))
+    elif isinstance(obj, list):
+        for v in obj: yield from _fields(v, prefix)
+    elif obj is not None:
+        yield prefix, obj
+
+class Ledger:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._reset()
+        self.refresh()
+
+    def _reset(self):
+        self._offsets = []      # seq -> (offset, length)
+        self._postings = {}     # token or "field:token" -> [seq] (ascending)
+        self._indexed = 0       # bytes of the file covered by the index
+        self._tail = None
+        self._open = None       # (seq, offset, keys) of an unterminated last line
+
+    def _index(self, offset: int, raw: bytes):
+        seq = len(self._offsets)
+        self._offsets.append((offset, len(raw)))
+        text = raw.decode("utf-8", "replace")
+        keys = tokens(text)
+        try:
+            for field, value in _fields(json.loads(text)):
+                keys |= {f"{field.lower()}:{t}" for t in tokens(value)}
+        except ValueError:
+            pass  # unparseable lines stay searchable by their raw tokens
+        for k in keys: self._postings.setdefault(k, []).append(seq)
+        self._tail = text
+        return seq, keys
+
+    def _reopen(self):
+        """Drop the unterminated last line from the index so it can be re-read with its new bytes."""
+        seq, offset, keys = self._open
+        for k in keys:
+            p = self._postings[k]; p.pop()  # seq is the newest, so always the last posting
+            if not p: del self._postings[k]
+        del self._offsets[seq:]
+        self._indexed, self._open = offset, None
+        self._tail = self._read([seq - 1])[0] if seq else None
+
+    def _catch_up(self):
+        try: size = os.path.getsize(self.path)
+        except FileNotFoundError: size = 0
+        if size < self._indexed: self._reset()  # truncated / replaced underneath us
+        if size == self._indexed: return
+        if self._open: self._reopen()  # the unterminated line grew (or got its newline)
+        with open(self.path, "rb") as f:
+            f.seek(self._indexed); pos = self._indexed
+            for line in f:
+                raw = line.rstrip(b"\r\n")
+                if raw.strip():
+                    seq, keys = self._index(pos, raw)
+                    if not line.endswith(b"\n"): self._open = (seq, pos, keys)
+                pos += len(line)
+            self._indexed = pos
+
+    def refresh(self):
+        with self._lock: self._catch_up()
+
+    def append(self, record: dict) -> int:
+        raw = json.dumps(record, separators=(",", ":"), ensure_ascii=False).encode()
+        with self._lock:
+            self._catch_up()
+            with open(self.path, "ab") as f:
+                # never glue a record onto an unterminated line
+                f.write((b"\n" if self._open else b"") + raw + b"\n")
+            self._catch_up()  # indexes just the bytes we wrote
+            return len(self._offsets) - 1
+
+    def __len__(self) -> int:
+        self.refresh(); return len(self._offsets)
+
+    def tail(self):
+        self.refresh(); return self._tail
+
+    def _read(self, seqs):
+        with open(self.path, "rb") as f:
+            out = []
+            for s in seqs:
+                off, n = self._offsets[s]; f.seek(off)
+                out.append(f.read(n).decode("utf-8", "replace"))
+            return out
+
+    def query(self, q: str = "", limit: int = 50, cursor: int | None = None):
+        """Return (raw lines newest-first, next_cursor or None)."""
+        self.refresh()
+        with self._lock:
+            keys = []
+            for term in q.split():
+                field, sep, value = term.rpartition(":")
+                if sep and field and value:
+                    keys += [f"{field.lower()}:{t}" for t in tokens(value)]
+                else:
+                    keys += list(tokens(term))
+            hi = len(self._offsets) if cursor is None else max(0, min(cursor, len(self._offsets)))
+            if not keys:
+                seqs = list(range(hi - 1, max(-1, hi - 1 - limit), -1))
+            else:
+                lists = sorted((self._postings.get(k, []) for k in keys), key=len)
+                seqs, driver = [], lists[0]
+                i = bisect.bisect_left(driver, hi) - 1
+                while i >= 0 and len(seqs) < limit:
+                    s = driver[i]; i -= 1
+                    if all((j := bisect.bisect_left(p, s)) < len(p) and p[j] == s for p in lists[1:]): seqs.append(s)
+            nxt = seqs[-1] if len(seqs) == limit and seqs[-1] > 0 else None
+            return self._read(seqs), nxt
@@ -0,0 +1,212 @@
+"""Policy engine for policy/sets/*.yaml.
+
+A set is compiled once into rules indexed by their `match` step (rules without `match`
+apply to every step, in file order). Each rule keeps its checks pre-parsed:
+  require_prev   frozenset of steps that must already have run
+  window_utc     {"after": "HH:MM", "before": "HH:MM"} inclusive; after > before wraps midnight
+  days_allow     ["Mon", ...]
+  deny_if        expressions, e.g.  container.privileged == true
+                 operands: dotted attribute paths, true/false/null, numbers, 'strings', [lists]
+                 operators: == != < <= > >= in, not in, and, or, not, parentheses
+The first failing rule denies; `default: deny` denies steps that no rule `match`es
+(rules without `match` never count as a match).
+PolicyStore maps tenants (tenants/config.json) to compiled sets and recompiles only
+when a file changes.
+"""
+import datetime as dt, json, operator, os, re, threading
+import yaml
+
+DAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+_MISSING = object()
+
+class PolicyError(ValueError):
+    pass
+
+# ---------- deny_if expressions ----------
+_TOK = re.compile(r"\s*(?:(?P<num>-?\d+(?:\.\d+)?)|(?P<str>'[^']*'|\"[^\"]*\")|(?P<op>==|!=|<=|>=|<|>|[()\[\],])|(?P<name>[A-Za-z_][\w.\-]*))")
+_CMP = {"==": operator.eq, "!=": operator.ne, "<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge,
+        "in": lambda a, b: b is not None and a in b, "not in": lambda a, b: b is None or a not in b}
+_CONST = {"true": True, "false": False, "null": None, "none": None}
+
+def _lex(src: str):
+    out, pos, src = [], 0, src.strip()
+    while pos < len(src):
+        m = _TOK.match(src, pos)
+        if not m or m.end() == pos: raise PolicyError(f"bad expression at {pos}: {src!r}")
+        kind = m.lastgroup; val = m.group(kind); pos = m.end()
+        if kind == "num": out.append(("lit", float(val) if "." in val else int(val)))
+        elif kind == "str": out.append(("lit", val[1:-1]))
+        elif kind == "op": out.append(("op", val))
+        elif val.lower() in _CONST: out.append(("lit", _CONST[val.lower()]))
+        elif val in ("and", "or", "not", "in"): out.append(("op", val))
+        else: out.append(("path", tuple(val.split("."))))
+    return out
+
+def _get(attrs, path):
+    for k in path:
+        if not isinstance(attrs, dict): return None
+        attrs = attrs.get(k, _MISSING)
+        if attrs is _MISSING: return None
+    return attrs
+
+class _Parser:
+    def __init__(self, src):
+        self.src, self.toks, self.i = src, _lex(src), 0
+    def peek(self, *ops):
+        t = self.toks[self.i] if self.i < len(self.toks) else (None, None)
+        return t if not ops or (t[0] == "op" and t[1] in ops) else None
+    def take(self, op):
+        if not self.peek(op): raise PolicyError(f"expected {op!r} in {self.src!r}")
+        self.i += 1
+    def parse(self):
+        fn = self.or_()
+        if self.i != len(self.toks): raise PolicyError(f"trailing tokens in {self.src!r}")
+        return fn
+    def or_(self):
+        fns = [self.and_()]
+        while self.peek("or"): self.i += 1; fns.append(self.and_())
+        return fns[0] if len(fns) == 1 else (lambda a: any(f(a) for f in fns))
+    def and_(self):
+        fns = [self.not_()]
+        while self.peek("and"): self.i += 1; fns.append(self.not_())
+        return fns[0] if len(fns) == 1 else (lambda a: all(f(a) for f in fns))
+    def not_(self):
+        if self.peek("not"):
+            self.i += 1; f = self.not_(); return lambda a: not f(a)
+        return self.cmp()
+    def cmp(self):
+        left = self.operand()
+        if self.peek("not") and self.i + 1 < len(self.toks) and self.toks[self.i + 1] == ("op", "in"):
+            self.i += 2; op = "not in"
+        elif self.peek(*_CMP): op = self.toks[self.i][1]; self.i += 1
+        else: return lambda a: bool(left(a))
+        right, fn = self.operand(), _CMP[op]
+        def test(a):
+            try: return fn(left(a), right(a))
+            except TypeError: return False  # e.g. None < 3: an unset attribute never trips a rule
+        return test
+    def operand(self):
+        kind, val = self.peek()
+        if kind == "lit": self.i += 1; return lambda a: val
+        if kind == "path": self.i += 1; return lambda a: _get(a, val)
+        if self.peek("("):
+            self.i += 1; f = self.or_(); self.take(")"); return f
+        if self.peek("["):
+            self.i += 1; items = []
+            while not self.peek("]"):
+                k, v = self.peek()
+                if k != "lit": raise PolicyError(f"list items must be literals in {self.src!r}")
+                items.append(v); self.i += 1
+                if not self.peek("]"): self.take(",")
+            self.i += 1; items = frozenset(items)
+            return lambda a: items
+        raise PolicyError(f"unexpected {val!r} in {self.src!r}")
+
+def compile_expr(src: str):
+    """Compile a deny_if expression into a predicate over an attrs dict."""
+    return _Parser(str(src)).parse()
+
+# ---------- rules and sets ----------
+def _secs(hhmm: str) -> int:
+    h, m = (list(map(int, str(hhmm).split(":"))) + [0])[:2]
+    return h * 3600 + m * 60
+
+class Rule:
+    __slots__ = ("id", "message", "match", "require_prev", "window", "days", "deny_if")
+    def __init__(self, r: dict):
+        self.id, self.message, self.match = r.get("id"), r.get("message", ""), r.get("match")
+        self.require_prev = frozenset(r.get("require_prev") or ())
+        w = r.get("window_utc")
+        self.window = (_secs(w.get("after", "00:00")), _secs(w.get("before", "24:00"))) if w else None
+        days = r.get("days_allow")
+        if days and not set(days) <= set(DAYS): raise PolicyError(f"{self.id}: bad days_allow {days}")
+        self.days = frozenset(DAYS.index(d) for d in days) if days else None
+        self.deny_if = tuple(compile_expr(e) for e in r.get("deny_if") or ())
+
+    def check(self, attrs: dict, seen, day: int, secs: int) -> bool:
+        if self.require_prev and not self.require_prev <= seen: return False
+        if self.window:
+            lo, hi = self.window
+            if not (lo <= secs <= hi if lo <= hi else secs >= lo or secs <= hi): return False
+        if self.days is not None and day not in self.days: return False
+        return not any(f(attrs) for f in self.deny_if)
+
+class PolicySet:
+    def __init__(self, doc: dict, name: str = ""):
+        self.name, self.default = name, (doc or {}).get("default", "allow")
+        self.rules = [Rule(r) for r in (doc or {}).get("rules", [])]
+        order = {id(r): i for i, r in enumerate(self.rules)}
+        self._any = tuple(r for r in self.rules if not r.match)
+        self._by_step = {}
+        for r in self.rules:
+            if r.match: self._by_step.setdefault(r.match, []).append(r)
+        # merge wildcard rules in file order so evaluation order matches the YAML
+        self._by_step = {s: tuple(sorted(rs + list(self._any), key=lambda r: order[id(r)])) for s, rs in self._by_step.items()}
+
+    @classmethod
+    def load(cls, path: str):
+        with open(path, encoding="utf-8") as f:
+            return cls(yaml.safe_load(f), os.path.splitext(os.path.basename(path))[0])
+
+    def _eval(self, attrs, seen, day, secs):
+        step = attrs.get("step")
+        rules = self._by_step.get(step, self._any)
+        for r in rules:
+            if not r.check(attrs, seen, day, secs): return {"deny": r.id, "msg": r.message}
+        # wildcard rules only constrain steps; a step is matched by a rule naming it
+        if step not in self._by_step and self.default == "deny": return {"deny": "default", "msg": f"no rule allows step {step!r}"}
+        return {"allow": True}
+
+    def evaluate(self, attrs: dict, now: dt.datetime | None = None) -> dict:
+        """Decide one step: attrs holds "step", optional "seen" and anything deny_if reads."""
+        now = now or dt.datetime.now(dt.timezone.utc)
+        return self._eval(attrs, frozenset(attrs.get("seen") or ()), now.weekday(), now.hour * 3600 + now.minute * 60 + now.second)
+
+    def evaluate_plan(self, steps, attrs: dict | None = None, now: dt.datetime | None = None) -> dict:
+        """Decide a whole run plan at one instant. steps are names or dicts merged over attrs;
+        every allowed step counts as seen for the steps after it."""
+        now = now or dt.datetime.now(dt.timezone.utc)
+        day, secs = now.weekday(), now.hour * 3600 + now.minute * 60 + now.second
+        base = dict(attrs or {}); seen = set(base.pop("seen", None) or ())
+        out = []
+        for s in steps:
+            a = {**base, **s} if isinstance(s, dict) else {**base, "step": s}
+            d = self._eval(a, seen, day, secs)
+            out.append({"step": a.get("step"), **d})
+            if "allow" in d: seen.add(a.get("step"))
+        return {"allow": all("allow" in d for d in out), "policy_set": self.name, "steps": out}
+
+class PolicyStore:
+    """Tenant -> compiled PolicySet, rebuilt only when tenants/config.json or a set file changes."""
+    def __init__(self, root: str = ".", tenants: str = "tenants/config.json", sets: str = "policy/sets"):
+        self.tenants_path, self.sets_dir = os.path.join(root, tenants), os.path.join(root, sets)
+        self._lock = threading.Lock()
+        self._config, self._config_key, self._sets = {}, None, {}  # sets: name -> (stat key, PolicySet)
+
+    @staticmethod
+    def _key(path):
+        st = os.stat(path); return st.st_size, st.st_mtime_ns, st.st_ino
+
+    def _tenants(self):
+        key = self._key(self.tenants_path)
+        if key != self._config_key:
+            with open(self.tenants_path, encoding="utf-8") as f: self._config = json.load(f)
+            self._config_key = key
+        return self._config
+
+    def policy_set(self, name: str) -> PolicySet:
+        with self._lock:
+            path = os.path.join(self.sets_dir, f"{name}.yaml")
+            key, hit = self._key(path), self._sets.get(name)
+            if not hit or hit[0] != key:
+                hit = self._sets[name] = (key, PolicySet.load(path))
+            return hit[1]
+
+    def for_tenant(self, tenant: str | None = None) -> PolicySet:
+        with self._lock:
+            cfg = self._tenants()
+            t = cfg.get("tenants", {}).get(tenant or cfg.get("default_tenant")) or cfg.get("tenants", {}).get(cfg.get("default_tenant"), {})
+        return self.policy_set(t.get("policy_set", "baseline"))
+
+    def evaluate(self, tenant, attrs, now=None): return self.for_tenant(tenant).evaluate(attrs, now)
+    def evaluate_plan(self, tenant, steps, attrs=None, now=None): return self.for_tenant(tenant).evaluate_plan(steps, attrs, now)
@@ -1,10 +1,10 @@
-import re, json
+import re
+from codex.redactor import Redactor
 RE_EMAIL = re.compile(r'[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}')
 RE_IP    = re.compile(r'\b(?:\d{1,3}\.){3}\d{1,3}\b')
 RE_TOKEN = re.compile(r'(?:api|token|secret|key)[=:\s]([A-Za-z0-9_\-]{12,})', re.I)
+REDACTOR = Redactor([(RE_EMAIL, '[REDACTED_EMAIL]'), (RE_IP, '[REDACTED_IP]'), (RE_TOKEN, 'SECRET=[REDACTED]')])
 def scrub_obj(o):
-    s=json.dumps(o, separators=(',',':'))
-    s = RE_EMAIL.sub('[REDACTED_EMAIL]', s)
-    s = RE_IP.sub('[REDACTED_IP]', s)
-    s = RE_TOKEN.sub('SECRET=[REDACTED]', s)
-    return json.loads(s)
+    return REDACTOR.scrub(o)
+def scrub_ndjson(lines):
+    return REDACTOR.scrub_ndjson(lines)
@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+# Glyph strings compiled per second: cold (unique strings) vs warm (repeats hit the memo cache).
+import os, sys, time, random
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from codex.aeturnum.holonous import compile_glyphs, compile_many, _compile, GLYPH_MAP
+n=int(sys.argv[1]) if len(sys.argv)>1 else 100000
+rnd=random.Random(7); glyphs=list(GLYPH_MAP)
+texts=["; ".join(rnd.choice(glyphs) for _ in range(rnd.randint(3,10)))+f"; note {i}" for i in range(n)]
+def rate(fn):
+    _compile.cache_clear(); t=time.perf_counter(); fn(); return n/(time.perf_counter()-t)
+cold=rate(lambda: [compile_glyphs(t) for t in texts])
+hot=texts[:64]*(n//64)
+_compile.cache_clear(); [compile_glyphs(t) for t in hot[:64]]
+t=time.perf_counter(); compile_many(hot); warm=len(hot)/(time.perf_counter()-t)
+print(f"cold {cold:,.0f} glyph strings/s | warm (repeated) {warm:,.0f} glyph strings/s | n={n}")
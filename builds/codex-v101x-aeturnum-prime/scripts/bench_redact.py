@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+# Telemetry records redacted per second: legacy dumps/regex x3/loads vs the single-pass engine.
+import os, sys, time, json, random
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from codex.redact import scrub_obj, RE_EMAIL, RE_IP, RE_TOKEN
+def legacy(o):
+    s=json.dumps(o, separators=(',',':'))
+    s=RE_EMAIL.sub('[REDACTED_EMAIL]', s); s=RE_IP.sub('[REDACTED_IP]', s); s=RE_TOKEN.sub('SECRET=[REDACTED]', s)
+    return json.loads(s)
+n=int(sys.argv[1]) if len(sys.argv)>1 else 20000
+rnd=random.Random(7)
+recs=[{"ts":1700000000+i,"tenant":rnd.choice(["cfbk","aeturnum","neuro"]),"event":rnd.choice(["compile","deploy","scan"]),
+       "user":{"email":f"user{i}@example.org","ip":f"10.0.{i%256}.{rnd.randint(1,254)}"},
+       "msg":f"run {i} api={'x'*16} ok" if i%10==0 else f"run {i} ok",
+       "eeg":[round(rnd.gauss(0,1),4) for _ in range(64)],"tags":["a","b","c"]} for i in range(n)]
+def rate(fn):
+    t=time.perf_counter(); fn(); return n/(time.perf_counter()-t)
+# overlapping / adjacent matches and PII in keys must come out exactly as the legacy path leaves them
+tricky=[{"m":"key=user@example.com"},{"m":"api=abcdefghijklmnop@mail.example.org"},{"bob@x.com":1,"10.0.0.1":{"x":"y"}},
+        {"m":"token:ABCDEFGHIJKLMN 10.0.0.1 a@b.io"},{"m":"10.0.0.1@host.example.com"},{"m":"key 192.168.1.10 secret=abcdefghijkl@z.co"},
+        {"m":["x@y.zz.key=abcdefghijklmnop", "user.10.0.0.1@e.org"]}]
+for r in tricky: assert legacy(r)==scrub_obj(r), (r, legacy(r), scrub_obj(r))
+assert all(legacy(r)==scrub_obj(r) for r in recs[:500])
+old=rate(lambda: [legacy(r) for r in recs]); new=rate(lambda: [scrub_obj(r) for r in recs])
+print(f"legacy {old:,.0f} records/s | single-pass {new:,.0f} records/s | x{new/old:.1f} | n={n}")
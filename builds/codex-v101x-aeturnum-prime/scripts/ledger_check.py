@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+# Ledger engine sanity checks: the shipped ledger (one line, no trailing newline) counts and matches like
+# the original line-scan endpoints, and an unterminated last line is re-indexed as it grows.
+import os, sys, tempfile
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from codex.aeturnum.ledger import Ledger
+shipped = Ledger(os.path.join(ROOT, "codex", "aeturnum", "ledger.jsonl"))
+assert len(shipped) == 1, len(shipped)
+assert len(shipped.query("101")[0]) == 1
+with tempfile.TemporaryDirectory() as d:
+    path = os.path.join(d, "ledger.jsonl")
+    with open(path, "w") as f: f.write('{"event":"a"}\n{"event":"par')
+    lg = Ledger(path)
+    assert len(lg) == 2 and lg.tail() == '{"event":"par' and len(lg.query("par")[0]) == 1
+    with open(path, "a") as f: f.write('tial"}\n')  # the torn line completes
+    assert len(lg) == 2 and not lg.query("par")[0] and len(lg.query("event:partial")[0]) == 1
+    with open(path, "a") as f: f.write('{"event":"b"}')
+    lg.append({"event": "c"})  # must start on a fresh line
+    assert len(lg) == 4 and [len(lg.query(f"event:{e}")[0]) for e in "abc"] == [1, 1, 1]
+    assert len(Ledger(path)) == 4
+print(f"ledger ok: shipped ledger has {len(shipped)} entry")
@@ -1,19 +1,14 @@
 #!/usr/bin/env python3
-import json, yaml, datetime as dt, sys
-pset=sys.argv[1]; attrs=json.loads(open(sys.argv[2]).read()) if len(sys.argv)>2 else {}
-pol=yaml.safe_load(open(pset)); now=dt.datetime.utcnow()
-def timeok(rule):
-    w=rule.get("window_utc"); 
-    if not w: return True
-    h=lambda t: dt.time(*map(int,t.split(":"))); t=now.time()
-    return h(w["after"])<=t<=h(w["before"])
-def dayok(rule):
-    days=rule.get("days_allow"); 
-    return True if not days else now.strftime("%a") in days
-for r in pol.get("rules",[]):
-    if r.get("match") and attrs.get("step")!=r["match"]: continue
-    if "require_prev" in r and not set(r["require_prev"]).issubset(set(attrs.get("seen",[]))):
-        print(json.dumps({"deny":r["id"],"msg":r["message"]})); sys.exit(3)
-    if not timeok(r): print(json.dumps({"deny":r["id"],"msg":r["message"]})); sys.exit(3)
-    if not dayok(r): print(json.dumps({"deny":r["id"],"msg":r["message"]})); sys.exit(3)
-print(json.dumps({"allow":True}))
+# Usage: policy_eval.py (SET.yaml | --tenant T) [attrs.json] [--plan step,step,...]
+# Prints the decision as JSON; exits 3 on deny.
+import os, sys, json, argparse
+ROOT=os.path.dirname(os.path.dirname(os.path.abspath(__file__))); sys.path.insert(0, ROOT)
+from codex.policy import PolicySet, PolicyStore
+ap=argparse.ArgumentParser(); ap.add_argument("pset", nargs="?"); ap.add_argument("attrs", nargs="?")
+ap.add_argument("--tenant"); ap.add_argument("--plan", help="comma-separated steps, evaluated in order")
+a=ap.parse_args()
+if not a.pset and not a.tenant: ap.error("give a policy set file or --tenant")
+pol=PolicySet.load(a.pset) if a.pset else PolicyStore(ROOT).for_tenant(a.tenant)
+attrs=json.loads(open(a.attrs).read()) if a.attrs else {}
+res=pol.evaluate_plan(a.plan.split(","), attrs) if a.plan else pol.evaluate(attrs)
+print(json.dumps(res)); sys.exit(0 if res.get("allow") else 3)
@@ -1,12 +1,19 @@
+import numpy as np
 import pandas as pd
-from neuro.signal_models import bandpower
 
-def decode_csv(path:str)->dict:
-    df=pd.read_csv(path)
-    feats=[]
-    for _,row in df.iterrows():
-        ch = [float(x) for x in row.values[2:]]
-        feats.append(bandpower(ch))
-    avg_power = sum(f['power'] for f in feats)/max(1,len(feats))
+CHUNK_ROWS = 262144
+
+def decode_csv(path:str, chunksize:int=CHUNK_ROWS)->dict:
+    """Stream the CSV in chunks of float32 channel columns; per-row mean/std/power
+    (as signal_models.bandpower) are computed column-wise and only running sums are kept."""
+    cols=list(pd.read_csv(path, nrows=0).columns)[2:]  # skip subject_id_sha256, ts
+    n=0; sums=np.zeros(3)  # sum over rows of mean, std, power
+    for chunk in pd.read_csv(path, usecols=cols, dtype={c:np.float32 for c in cols}, chunksize=chunksize):
+        X=chunk.to_numpy(dtype=np.float64, copy=False)
+        if not len(X): continue
+        mean=X.mean(axis=1); power=np.einsum('ij,ij->i', X, X)/X.shape[1]
+        std=np.sqrt(np.maximum(power-mean*mean, 0.0))
+        sums+=(mean.sum(), std.sum(), power.sum()); n+=len(X)
+    avg_mean, avg_std, avg_power = (sums/max(1,n)).tolist()
     label = "rest" if avg_power < 0.05 else "active"
-    return {"n_samples": len(df), "features_summary": {"avg_power": avg_power}, "label_demo": label}
+    return {"n_samples": n, "features_summary": {"avg_power": avg_power, "avg_mean": avg_mean, "avg_std": avg_std}, "label_demo": label}
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+# consent status() latency: materialised ConsentStore vs the previous replay-the-ledger-per-call scan.
+import json, os, sys, time, tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from telemetry.consent import ConsentStore
+def legacy(path, subject):
+    scopes={}
+    with open(path, encoding='utf-8') as f:
+        for ln in f:
+            r=json.loads(ln)
+            if r.get('subject_id_sha256')==subject: scopes[r.get('scope')]=bool(r.get('grant'))
+    return {"subject_id_sha256":subject,"scopes":scopes}
+n=int(sys.argv[1]) if len(sys.argv)>1 else 200_000; subjects=5_000
+with tempfile.TemporaryDirectory() as d:
+    path=os.path.join(d, "consent_ledger.jsonl")
+    t=time.perf_counter()
+    ConsentStore(path, snapshot_every=n).apply_many((f"s{i%subjects}", ("eeg","share","research")[i%3], i%7!=0) for i in range(n))
+    write=n/(time.perf_counter()-t)
+    if os.path.exists(os.path.join(d, "consent_state.json")): os.remove(os.path.join(d, "consent_state.json"))
+    t=time.perf_counter(); store=ConsentStore(path); cold=time.perf_counter()-t  # no snapshot yet: full replay
+    store.snapshot(); t=time.perf_counter(); store=ConsentStore(path); warm=time.perf_counter()-t
+    reps=20; t=time.perf_counter()
+    for i in range(reps): ref=legacy(path, f"s{i}")
+    old=(time.perf_counter()-t)/reps
+    assert store.status(f"s{reps-1}")==ref
+    reps=200_000; t=time.perf_counter()
+    for i in range(reps): store.status(f"s{i%subjects}")
+    new=(time.perf_counter()-t)/reps
+    print(f"{n:,} ledger lines | batched writes {write:,.0f}/s | open: replay {cold*1e3:.0f} ms, snapshot {warm*1e3:.0f} ms | "
+          f"status: scan {old*1e3:.1f} ms, materialised {new*1e6:.1f} us (x{old/new:,.0f})")
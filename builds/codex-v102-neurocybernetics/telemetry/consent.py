@@ -1,23 +1,119 @@
-import json, time
+"""Consent ledger with a materialised subject -> {scope: granted} map.
+
+consent_ledger.jsonl stays the append-only source of truth. The map is updated on every
+append and snapshotted to consent_state.json together with the ledger bytes it covers
+(and the last line's hash, to notice a rewritten ledger), so opening replays only the
+lines after the snapshot. Lines appended by other writers are picked up by a stat()
+check before each lookup; status() is then a dict lookup.
+"""
+import atexit, hashlib, json, os, threading, time
+try:
+    import fcntl
+except ImportError:  # non-POSIX
+    fcntl = None
 LEDGER='telemetry/consent_ledger.jsonl'
 
+class ConsentStore:
+    def __init__(self, path=LEDGER, state_path=None, snapshot_every=1000):
+        self.path, self.snapshot_every = path, snapshot_every
+        self.state_path = state_path or os.path.join(os.path.dirname(path) or '.', 'consent_state.json')
+        self._lock = threading.Lock()
+        if not self._load_snapshot(): self._reset()
+        self._catch_up()
+
+    def _reset(self):
+        self._scopes = {}; self._bytes = 0; self._tail = None; self._dirty = 0
+
+    def _apply(self, r):
+        self._scopes.setdefault(r.get('subject_id_sha256'), {})[r.get('scope')] = bool(r.get('grant'))
+
+    def _catch_up(self):
+        try: size = os.path.getsize(self.path)
+        except FileNotFoundError: size = 0
+        if size < self._bytes: self._reset()  # truncated / replaced underneath us
+        if size == self._bytes: return
+        with open(self.path, 'rb') as f:
+            f.seek(self._bytes); off = self._bytes
+            for ln in f:
+                if not ln.endswith(b'\n'): break  # partial write in progress; next time
+                raw = ln.rstrip(b'\r\n')
+                if raw.strip():
+                    try: self._apply(json.loads(raw))
+                    except ValueError: pass
+                    self._tail = [off, len(raw), hashlib.sha256(raw).hexdigest()]; self._dirty += 1
+                off += len(ln)
+            self._bytes = off
+        if self._dirty >= self.snapshot_every: self._snapshot()
+
+    def _load_snapshot(self):
+        try:
+            with open(self.state_path, encoding='utf-8') as f: snap = json.load(f)
+            if os.path.getsize(self.path) < snap['ledger_bytes']: return False
+            if snap['tail']:
+                off, n, digest = snap['tail']
+                with open(self.path, 'rb') as f:
+                    f.seek(off)
+                    if hashlib.sha256(f.read(n)).hexdigest() != digest: return False  # ledger rewritten
+        except (OSError, ValueError, KeyError):
+            return False
+        self._scopes, self._bytes, self._tail, self._dirty = snap['subjects'], snap['ledger_bytes'], snap['tail'], 0
+        return True
+
+    def _snapshot(self):
+        tmp = self.state_path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'ledger_bytes': self._bytes, 'tail': self._tail, 'subjects': self._scopes}, f, separators=(',', ':'))
+        os.replace(tmp, self.state_path); self._dirty = 0
+
+    def snapshot(self):
+        with self._lock:
+            self._catch_up()
+            if self._dirty: self._snapshot()
+
+    def apply_many(self, changes)->list:
+        """Append many (subject_sha, scope, grant) changes with one write; returns the records."""
+        now = time.time()
+        recs = [{"ts":now,"subject_id_sha256":s,"scope":sc,"grant":bool(g)} for s, sc, g in changes]
+        if not recs: return recs
+        blob = ''.join(json.dumps(r, separators=(',',':'))+'\n' for r in recs).encode()
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(self.path, 'ab') as f:
+                if fcntl: fcntl.flock(f, fcntl.LOCK_EX)  # keep batches from interleaving across processes
+                try: f.write(blob)
+                finally:
+                    if fcntl: fcntl.flock(f, fcntl.LOCK_UN)
+            self._catch_up()  # applies our batch (and anything another writer slipped in before it)
+        return recs
+
+    def status(self, subject_sha:str)->dict:
+        with self._lock:
+            self._catch_up()
+            return {"subject_id_sha256":subject_sha,"scopes":dict(self._scopes.get(subject_sha, {}))}
+
+    def allowed(self, subject_sha:str, scope:str)->bool:
+        with self._lock:
+            self._catch_up()
+            return self._scopes.get(subject_sha, {}).get(scope, False)
+
+_store = None
+def store()->ConsentStore:
+    global _store
+    if _store is None:
+        _store = ConsentStore(LEDGER); atexit.register(_store.snapshot)
+    return _store
+
 def grant(subject_sha:str, scope:str)->dict:
-    rec={"ts":time.time(),"subject_id_sha256":subject_sha,"scope":scope,"grant":True}
-    with open(LEDGER,'a',encoding='utf-8') as f: f.write(json.dumps(rec,separators=(',',':'))+'\n')
-    return rec
+    return store().apply_many([(subject_sha, scope, True)])[0]
 
 def revoke(subject_sha:str, scope:str)->dict:
-    rec={"ts":time.time(),"subject_id_sha256":subject_sha,"scope":scope,"grant":False}
-    with open(LEDGER,'a',encoding='utf-8') as f: f.write(json.dumps(rec,separators=(',',':'))+'\n')
-    return rec
+    return store().apply_many([(subject_sha, scope, False)])[0]
+
+def grant_many(pairs)->list:
+    return store().apply_many((s, sc, True) for s, sc in pairs)
+
+def revoke_many(pairs)->list:
+    return store().apply_many((s, sc, False) for s, sc in pairs)
 
 def status(subject_sha:str)->dict:
-    scopes={}
-    try:
-        for ln in open(LEDGER,'r',encoding='utf-8').read().splitlines():
-            r=json.loads(ln)
-            if r.get('subject_id_sha256')==subject_sha:
-                scopes[r['scope']]=r['grant']
-    except FileNotFoundError:
-        pass
-    return {"subject_id_sha256":subject_sha,"scopes":scopes}
+    return store().status(subject_sha)
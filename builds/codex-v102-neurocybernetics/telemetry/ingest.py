@@ -1,9 +1,13 @@
-import json, csv
 from telemetry.redact import scrub
-STORE='telemetry/store.csv'
+from telemetry.store import open_store
+STORE='telemetry/store'  # columnar store directory, see telemetry/store.py
+
+store=open_store(STORE)
 
 def ingest(rec:dict)->dict:
-    safe=scrub(rec)
-    with open(STORE,'a',newline='',encoding='utf-8') as f:
-        w=csv.writer(f); w.writerow([safe.get('subject_id_sha256'), safe.get('ts'), json.dumps(safe.get('eeg',[]))])
+    safe=scrub(rec); store.append_many([safe])
     return {"ok":True,"wrote":len(safe.get('eeg',[]))}
+
+def ingest_many(recs)->dict:
+    safe=[scrub(r) for r in recs]; store.append_many(safe)
+    return {"ok":True,"count":len(safe),"wrote":sum(len(s.get('eeg',[])) for s in safe)}
@@ -1,10 +1,10 @@
-import re, json
+import re
+from telemetry.redactor import Redactor
 RE_EMAIL = re.compile(r'[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}')
 RE_IP = re.compile(r'\b(?:\d{1,3}\.){3}\d{1,3}\b')
-RE_PID = re.compile(r'("name"|"phone"|"address"\s*:)".*?"', re.I)
+PID_KEYS = ('name', 'phone', 'address')  # values under these keys are redacted whole
+REDACTOR = Redactor([(RE_EMAIL, '[REDACTED_EMAIL]'), (RE_IP, '[REDACTED_IP]')], keys=PID_KEYS)
 def scrub(o: dict)->dict:
-    s=json.dumps(o, separators=(',',':'))
-    s=RE_EMAIL.sub('[REDACTED_EMAIL]', s)
-    s=RE_IP.sub('[REDACTED_IP]', s)
-    s=RE_PID.sub('\1"[REDACTED]"', s)
-    return json.loads(s)
+    return REDACTOR.scrub(o)
+def scrub_ndjson(lines):
+    return REDACTOR.scrub_ndjson(lines)
@@ -0,0 +1,143 @@
+"""Columnar, append-only telemetry store (replaces telemetry/store.csv).
+
+One directory of flat little-endian columns, appended in batches:
+  subjects.json   subject_id_sha256 dictionary (list index = id)
+  subject.u32     subject id per record
+  ts.f64          timestamp per record
+  eeg.f32         every record's EEG samples, concatenated
+  eeg_end.u64     end offset of each record in eeg.f32 (commit marker, written last)
+Readers memory-map the columns and filter by subject and time range with vectorised
+masks; nothing is parsed per row. A torn batch (columns longer than eeg_end) is
+truncated away on open.
+"""
+import atexit, csv, json, os, threading
+
+import numpy as np
+
+COLUMNS = {"subject": "<u4", "ts": "<f8", "eeg": "<f4", "eeg_end": "<u8"}
+EXT = {"subject": "subject.u32", "ts": "ts.f64", "eeg": "eeg.f32", "eeg_end": "eeg_end.u64"}
+
+
+class TelemetryStore:
+    def __init__(self, path: str, flush_rows: int = 4096, fsync: bool = True):
+        self.path, self.flush_rows, self.fsync = path, flush_rows, fsync
+        os.makedirs(path, exist_ok=True)
+        self._lock = threading.Lock()
+        self._buf = []  # (subject id, ts, eeg float32 array)
+        try:
+            with open(self._p("subjects.json"), encoding="utf-8") as f: self._subjects = json.load(f)
+        except FileNotFoundError:
+            self._subjects = []
+        self._sid = {s: i for i, s in enumerate(self._subjects)}
+        self._saved_subjects = len(self._subjects)
+        self._recover()
+
+    def _p(self, name):
+        return os.path.join(self.path, name)
+
+    def _recover(self):
+        ends = self._col("eeg_end")
+        self.size = len(ends)
+        n_eeg = int(ends[-1]) if self.size else 0
+        for col, n in (("subject", self.size), ("ts", self.size), ("eeg", n_eeg)):
+            with open(self._p(EXT[col]), "ab") as f: f.truncate(n * np.dtype(COLUMNS[col]).itemsize)
+        with open(self._p(EXT["eeg_end"]), "ab") as f: f.truncate(self.size * 8)
+
+    def _col(self, col, n=None):
+        path = self._p(EXT[col])
+        dt = np.dtype(COLUMNS[col])
+        size = os.path.getsize(path) // dt.itemsize if os.path.exists(path) else 0
+        n = size if n is None else min(n, size)
+        return np.memmap(path, dtype=dt, mode="r", shape=(n,)) if n else np.empty(0, dt)
+
+    # ---------- writes ----------
+    def append_many(self, recs) -> int:
+        """Buffer already-scrubbed records; writes a batch every flush_rows records."""
+        with self._lock:
+            for r in recs:
+                s = r.get("subject_id_sha256")
+                sid = self._sid.get(s)
+                if sid is None:
+                    sid = self._sid[s] = len(self._subjects); self._subjects.append(s)
+                self._buf.append((sid, float(r.get("ts") or 0.0), np.asarray(r.get("eeg") or (), dtype="<f4").ravel()))
+            n = len(self._buf)
+            if n >= self.flush_rows: self._flush()
+            return n
+
+    def flush(self):
+        with self._lock: self._flush()
+
+    def _flush(self):
+        if not self._buf: return
+        buf = self._buf
+        if len(self._subjects) > self._saved_subjects:
+            # the subject dictionary goes first, so every committed id resolves
+            tmp = self._p("subjects.json.tmp")
+            with open(tmp, "w", encoding="utf-8") as f: json.dump(self._subjects, f)
+            os.replace(tmp, self._p("subjects.json")); self._saved_subjects = len(self._subjects)
+        eeg = [e for _, _, e in buf]
+        base = int(self._col("eeg_end", self.size)[-1]) if self.size else 0
+        cols = {"subject": np.fromiter((s for s, _, _ in buf), "<u4", len(buf)),
+                "ts": np.fromiter((t for _, t, _ in buf), "<f8", len(buf)),
+                "eeg": np.concatenate(eeg) if eeg else np.empty(0, "<f4"),
+                "eeg_end": base + np.cumsum([len(e) for e in eeg], dtype="<u8")}
+        committed = {col: n * np.dtype(COLUMNS[col]).itemsize
+                     for col, n in (("subject", self.size), ("ts", self.size), ("eeg", base), ("eeg_end", self.size))}
+        try:
+            for col in ("subject", "ts", "eeg", "eeg_end"):
+                with open(self._p(EXT[col]), "ab") as f:
+                    f.write(cols[col].tobytes()); f.flush()
+                    if self.fsync: os.fsync(f.fileno())
+        except BaseException:
+            # drop the partial batch from every column so the next flush appends at committed offsets;
+            # the records stay buffered for a retry
+            for col, n in committed.items():
+                with open(self._p(EXT[col]), "ab") as f: f.truncate(n)
+            raise
+        self._buf = []
+        self.size += len(buf)
+
+    def close(self):
+        self.flush()
+
+    # ---------- reads ----------
+    def __len__(self) -> int:
+        return self.size
+
+    def select(self, subject=None, t0=None, t1=None) -> np.ndarray:
+        """Record indices matching subject_id_sha256 and t0 <= ts < t1 (each optional)."""
+        self.flush()  # buffered records are visible to readers in this process
+        n = self.size
+        mask = np.ones(n, dtype=bool)
+        if subject is not None:
+            sid = self._sid.get(subject)
+            if sid is None: return np.empty(0, dtype=np.int64)
+            mask &= self._col("subject", n) == sid
+        if t0 is not None or t1 is not None:
+            ts = self._col("ts", n)
+            if t0 is not None: mask &= ts >= t0
+            if t1 is not None: mask &= ts < t1
+        return np.flatnonzero(mask)
+
+    def scan(self, subject=None, t0=None, t1=None):
+        """Yield {"subject_id_sha256", "ts", "eeg"} for matching records; eeg is a float32 view."""
+        idx = self.select(subject, t0, t1)
+        if not len(idx): return
+        n = self.size
+        subj, ts, ends, eeg = self._col("subject", n), self._col("ts", n), self._col("eeg_end", n), self._col("eeg")
+        for i in idx:
+            a = int(ends[i - 1]) if i else 0
+            yield {"subject_id_sha256": self._subjects[subj[i]], "ts": float(ts[i]), "eeg": eeg[a:int(ends[i])]}
+
+    def import_csv(self, path: str) -> int:
+        """Load a legacy store.csv (subject_id_sha256, ts, eeg_json) into this store."""
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = [{"subject_id_sha256": s, "ts": float(t), "eeg": json.loads(e)} for s, t, e in list(csv.reader(f))[1:]]
+        self.append_many(rows); self.flush()
+        return len(rows)
+
+
+def open_store(path: str, **kw) -> TelemetryStore:
+    store = TelemetryStore(path, **kw)
+    atexit.register(store.close)  # buffered records reach disk on normal interpreter exit
+    return store
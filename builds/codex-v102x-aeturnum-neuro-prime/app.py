@@ -1,18 +1,38 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
-from fastapi.responses import HTMLResponse
-from pydantic import BaseModel, Field
-from typing import List, Dict
-import asyncio, time, json
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
+from typing import List, Dict, Optional
+from contextlib import asynccontextmanager
+import asyncio, math, os, struct, time, json
+import numpy as np
 
-from neuro.sim import eeg_synth, eeg_multichannel
-from neuro.signal import psd, bandpower, zscore
-from telemetry.privacy import scrub
+from neuro.sim import EEGStream, eeg_synth_array, eeg_multichannel_array
+from neuro.frames import decode_frame, encode_frame
+from neuro.online import OnlineFeatures, max_window
+from neuro.batch import COLUMNS as ANALYZE_COLUMNS, BatchAnalyzer, analyze as _analyze
+from neuro.codec import BINARY, CodecError, decode_signal, encode_table, media_type, wants
+from neuro.signal import BANDS, StreamFilter, psd_many, bandpower_many, zscore
+from telemetry.pipeline import Pipeline, open_sink
 
 APP_VER = "Codex Aeturnum v102.x · Neurocybernetics Prime"
 SUBJECT = "caleb fedor byker konev|1998-10-27"
 SUBJECT_SHA256 = "0f9d6b0c0e9f07e6a4cd3f8cc7e5c8a8f1e3b3f6f4b5a6c7d8e9f0a1b2c3d4e5"
 
-app = FastAPI(title=APP_VER)
+NDJSON = "application/x-ndjson"
+MAX_CHANNELS, MAX_FS = 256, 8192.0  # per stream; feature windows are further capped by neuro/online.max_window
+# recordings of /neuro/analyze:batch go to a process pool (NEURO_BATCH_WORKERS, default: one per core)
+analyzer = BatchAnalyzer(int(os.environ.get("NEURO_BATCH_WORKERS", "0")) or None)
+# /telemetry/batch: scrubbed NDJSON goes to TELEMETRY_SINK (see telemetry/pipeline.py)
+telemetry = Pipeline(open_sink(os.environ.get("TELEMETRY_SINK")), int(os.environ.get("TELEMETRY_WORKERS", "0")) or None)
+
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    analyzer.close(); telemetry.close()
+
+app = FastAPI(title=APP_VER, lifespan=lifespan)
 
 # Models
 class AnalyzeReq(BaseModel):
@@ -20,6 +40,12 @@ class AnalyzeReq(BaseModel):
     channel: str = "Cz"
     samples: List[float] = Field(..., min_items=8)
 
+class BatchItem(AnalyzeReq):
+    id: Optional[str] = None
+
+class BatchReq(BaseModel):
+    recordings: List[BatchItem]
+
 class MultiReq(BaseModel):
     n: int = 8
     fs: float = 256.0
@@ -59,54 +85,255 @@ def seal():
 
 @app.get("/neuro/stream")
 def neuro_stream(seconds: float = 2.0, fs: float = 256.0, alpha: float = 10.0, beta: float = 20.0, gamma: float = 40.0, noise: float = 0.3, blink: bool = False):
-    t, x = eeg_synth(fs=fs, seconds=seconds, alpha=alpha, beta=beta, gamma=gamma, noise=noise, blink=blink)
-    return {"ts": time.time(), "fs": fs, "channel": "Cz", "samples": x, "note": "synthetic EEG-like"}
+    t, x = eeg_synth_array(fs=fs, seconds=seconds, alpha=alpha, beta=beta, gamma=gamma, noise=noise, blink=blink)
+    return {"ts": time.time(), "fs": fs, "channel": "Cz", "samples": x.tolist(), "note": "synthetic EEG-like"}
 
 @app.websocket("/ws/stream")
-async def ws_stream(ws: WebSocket, fs: float = 256.0, alpha: float = 10.0, beta: float = 20.0, gamma: float = 40.0, noise: float = 0.3):
+async def ws_stream(ws: WebSocket, fs: float = 256.0, alpha: float = 10.0, beta: float = 20.0, gamma: float = 40.0, noise: float = 0.3,
+                    lo: float = 0.0, hi: float = 0.0, notch: float = 0.0, mode: str = "json", chunk: int = 0, channels: int = 1):
+    # mode=json: {"ts","fs","seq","samples"} (one channel) or "channels" (n lists); default chunk is one second.
+    # mode=binary: float32 frames (see neuro/frames.py); default chunk is 64 samples.
+    binary = mode == "binary"
+    chunk = max(8, min(chunk or (64 if binary else int(fs)), 65535))
+    channels = max(1, min(channels, MAX_CHANNELS))
+    # per-connection generator and filter state, so consecutive frames form one continuous signal;
+    # built before accept(): an out-of-range band or notch is ignored rather than failing the socket
+    gen = EEGStream(fs=fs, n=channels, alpha=alpha, beta=beta, gamma=gamma, noise=noise)
+    filt = StreamFilter(fs, band=(lo, hi) if 0 < lo < hi < fs / 2 else None, notch=notch if 0 < notch < fs / 2 else None)
     await ws.accept()
+    loop = asyncio.get_running_loop()
+    due, seq = loop.time(), 0
     try:
         while True:
-            _, x = eeg_synth(fs=fs, seconds=1.0, alpha=alpha, beta=beta, gamma=gamma, noise=noise, blink=False)
-            await ws.send_json({"ts": time.time(), "fs": fs, "samples": x})
-            await asyncio.sleep(1.0)
+            x = filt(gen.read(chunk)); ts = time.time()
+            if binary:
+                await ws.send_bytes(encode_frame(seq, ts, fs, x))
+            else:
+                x = x.astype(np.float32, copy=False)
+                await ws.send_json({"ts": ts, "fs": fs, "seq": seq, **({"samples": x[0].tolist()} if channels == 1 else {"channels": x.tolist()})})
+            seq += 1
+            # pace on an absolute schedule so frame jitter never accumulates into drift
+            due += chunk / fs
+            await asyncio.sleep(max(0.0, due - loop.time()))
     except WebSocketDisconnect:
         return
 
-@app.post("/neuro/analyze")
-def neuro_analyze(req: AnalyzeReq):
-    f, P = psd(req.samples, req.fs)
-    feat = {
-        "alpha": bandpower(f, P, 8, 12),
-        "beta": bandpower(f, P, 13, 30),
-        "gamma": bandpower(f, P, 31, 48)
-    }
-    z = zscore(req.samples)
-    return {"features": feat, "zmean": float(sum(z) / len(z))}
+def _feature_limits(fs, channels, window):
+    """Query-string stream sizes -> (channels, window) clamped so per-connection state stays bounded,
+    or None when fs is not a usable sample rate."""
+    if not (math.isfinite(fs) and 0 < fs <= MAX_FS):
+        return None
+    channels = max(1, min(channels, MAX_CHANNELS))
+    window = min(window, max_window(fs, channels)) if math.isfinite(window) else 0.0
+    return channels, window
+
+def _feature_msg(u, names):
+    return {"t": u["t"], "bands": list(BANDS), "channels": names, "features": u["features"].tolist()}
+
+async def _synthetic_features(fs, channels, window, every, alpha, beta, gamma, noise):
+    """Real-time synthetic source -> feature updates, one hop of samples at a time."""
+    gen = EEGStream(fs=fs, n=channels, alpha=alpha, beta=beta, gamma=gamma, noise=noise)
+    feats = OnlineFeatures(fs, channels, window=window, every=every)
+    names = [f"CH{i+1:02d}" for i in range(channels)]
+    loop = asyncio.get_running_loop(); due = loop.time()
+    while True:
+        for u in feats.push(gen.read(feats.hop)):
+            yield _feature_msg(u, names)
+        due += feats.hop / fs
+        await asyncio.sleep(max(0.0, due - loop.time()))
+
+@app.websocket("/ws/features")
+async def ws_features(ws: WebSocket, fs: float = 256.0, channels: int = 8, window: float = 2.0, every: int = 1, source: str = "synthetic",
+                      alpha: float = 10.0, beta: float = 20.0, gamma: float = 40.0, noise: float = 0.3):
+    # source=synthetic: server-generated stream; source=client: the client sends neuro/frames.py binary frames
+    # and gets a JSON feature update back whenever a window completes (fs/channels come from the frames);
+    # a text message closes with 1003, a malformed frame or a changed fs/channel count with 1007
+    limits = _feature_limits(fs, channels, window)
+    if limits is None:
+        await ws.close(code=1008); return  # rejects the handshake
+    await ws.accept()
+    try:
+        if source == "client":
+            feats = names = None
+            while True:
+                msg = await ws.receive()
+                if msg["type"] == "websocket.disconnect":
+                    return
+                if msg.get("bytes") is None:
+                    await ws.close(code=1003); return
+                try:
+                    frame = decode_frame(msg["bytes"])
+                    if feats is None:
+                        nch = len(frame["samples"])
+                        got = _feature_limits(frame["fs"], nch, window)
+                        if got is None or got[0] != nch:
+                            raise ValueError(f"unsupported stream: fs={frame['fs']}, channels={nch}")
+                        feats = OnlineFeatures(frame["fs"], nch, window=got[1], every=every)
+                        names = [f"CH{i+1:02d}" for i in range(nch)]
+                    elif frame["fs"] != feats.fs:
+                        raise ValueError(f"fs changed from {feats.fs} to {frame['fs']}")
+                    updates = feats.push(frame["samples"])
+                except (ValueError, struct.error):
+                    await ws.close(code=1007); return
+                for u in updates:
+                    await ws.send_json(_feature_msg(u, names))
+        else:
+            channels, window = limits
+            async for msg in _synthetic_features(fs, channels, window, every, alpha, beta, gamma, noise):
+                await ws.send_json(msg)
+    except WebSocketDisconnect:
+        return
+
+@app.get("/neuro/features/sse")
+async def neuro_features_sse(fs: float = 256.0, channels: int = 8, window: float = 2.0, every: int = 1,
+                             alpha: float = 10.0, beta: float = 20.0, gamma: float = 40.0, noise: float = 0.3):
+    limits = _feature_limits(fs, channels, window)
+    if limits is None:  # checked here: once the stream starts, errors can no longer become a status code
+        raise HTTPException(400, {"error": f"fs must be in (0, {MAX_FS:g}]"})
+    channels, window = limits
+    async def events():
+        async for msg in _synthetic_features(fs, channels, window, every, alpha, beta, gamma, noise):
+            yield f"data: {json.dumps(msg, separators=(',', ':'))}\n\n"
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+def _body_doc(model):
+    # the handlers read the body themselves, so describe the accepted bodies for OpenAPI here
+    return {"requestBody": {"required": True, "content": {"application/json": {"schema": model.model_json_schema()},
+            **{m: {"schema": {"type": "string", "format": "binary"}} for m in BINARY}}}}
+
+async def _read(request: Request, model):
+    """JSON body -> (model, None); binary body (see neuro/codec.py) -> (None, (fs, names, X))."""
+    body = await request.body()
+    ctype = media_type(request.headers.get("content-type"))
+    if ctype in BINARY:
+        fs, names = request.headers.get("x-sample-rate"), request.headers.get("x-channel-names")
+        try:
+            return None, decode_signal(ctype, body, float(fs) if fs else None, names.split(",") if names else None)
+        except (CodecError, ValueError) as e:
+            raise HTTPException(400, {"error": str(e)})
+    try:
+        return model.model_validate_json(body), None
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+
+def _reply(request: Request, rows, columns, table, as_json):
+    media = wants(request.headers.get("accept"))
+    if media is None:
+        return as_json()
+    try:
+        body, headers = encode_table(media, rows, columns, table)
+    except CodecError as e:
+        raise HTTPException(406, {"error": str(e)})
+    return Response(body, media_type=media, headers=headers)
+
+@app.post("/neuro/analyze", openapi_extra=_body_doc(AnalyzeReq))
+async def neuro_analyze(request: Request):
+    req, sig = await _read(request, AnalyzeReq)
+    fs, names, X = (req.fs, [req.channel], np.asarray([req.samples])) if req else sig
+    if X.shape[1] < 8:
+        raise HTTPException(400, {"error": "need at least 8 samples per channel"})
+    T = await run_in_threadpool(_analyze, fs, X)
+    def as_json():
+        rows = [{"features": dict(zip(BANDS, r[:-1])), "zmean": r[-1]} for r in T.tolist()]
+        if len(rows) == 1:
+            return rows[0]
+        return {"features": {n: r["features"] for n, r in zip(names, rows)}, "zmean": {n: r["zmean"] for n, r in zip(names, rows)}}
+    return _reply(request, names, ANALYZE_COLUMNS, T, as_json)
+
+def _batch_item(i, name, channel, fs, x):
+    if not (math.isfinite(fs) and fs > 0):  # checked per item, so it never reaches (and fails) a whole job
+        return {"i": i, "error": f"fs must be a positive finite number, got {fs}"}, None, None
+    return {"i": i, "id": name, "channel": channel}, fs, x
+
+def _batch_line(i, line):
+    try:
+        it = BatchItem.model_validate_json(line)
+    except ValidationError as e:  # a bad line fails that recording, not the batch
+        return {"i": i, "error": json.loads(e.json(include_url=False, include_input=False))}, None, None
+    return _batch_item(i, it.id, it.channel, it.fs, np.asarray(it.samples, dtype=np.float64))
+
+async def _ndjson_items(body):
+    for i, line in enumerate(l for l in body.splitlines() if l.strip()):
+        yield _batch_line(i, line)
+
+async def _batch_items(req, sig):
+    if req:
+        for i, it in enumerate(req.recordings):
+            yield _batch_item(i, it.id, it.channel, it.fs, np.asarray(it.samples, dtype=np.float64))
+    else:
+        fs, names, X = sig
+        for i, (name, x) in enumerate(zip(names, X)):
+            yield _batch_item(i, name, name, fs, x)
+
+_batch_doc = _body_doc(BatchReq)
+_batch_doc["requestBody"]["content"][NDJSON] = {"schema": BatchItem.model_json_schema()}
+
+@app.post("/neuro/analyze:batch", openapi_extra=_batch_doc, response_class=StreamingResponse)
+async def neuro_analyze_batch(request: Request):
+    """Many recordings -> NDJSON, one line per recording as it completes ({"i", "id", "channel", "features",
+    "zmean"} or {"i", "error"}). Body: {"recordings": [AnalyzeReq + "id", ...]}, the same items as NDJSON lines,
+    or a binary multi-channel blob (one recording per channel, see neuro/codec.py)."""
+    if media_type(request.headers.get("content-type")) == NDJSON:
+        # read up front: the streaming response below also listens on receive() for disconnects
+        items = _ndjson_items(await request.body())
+    else:
+        req, sig = await _read(request, BatchReq)
+        if sig and sig[2].shape[1] < 8:
+            raise HTTPException(400, {"error": "need at least 8 samples per channel"})
+        items = _batch_items(req, sig)
+    async def lines():
+        async for r in analyzer.run(items):
+            yield json.dumps(r, separators=(",", ":")) + "\n"
+    return StreamingResponse(lines(), media_type=NDJSON)
 
 @app.post("/neuro/multi")
 def neuro_multi(req: MultiReq):
-    return eeg_multichannel(n=req.n, fs=req.fs, seconds=req.seconds, alpha=req.alpha, beta=req.beta, gamma=req.gamma, noise=req.noise)
-
-@app.post("/neuro/topomap")
-def neuro_topomap(req: TopoReq):
-    ch_names = sorted(req.channels.keys())
-    grid = [[0.0] * 3 for _ in range(3)]
-    idx = 0
-    for r in range(3):
-        for c in range(3):
-            if idx < len(ch_names):
-                s = req.channels[ch_names[idx]]
-                f, P = psd(s, req.fs)
-                grid[r][c] = bandpower(f, P, 8, 12)
-            idx += 1
-    return {"grid": grid, "note": "toy 3x3 topomap of alpha bandpower"}
-
-@app.post("/telemetry/batch")
-def telemetry_batch(batch: TeleBatch):
-    safe = [scrub(x) for x in batch.items]
-    size = sum(len(json.dumps(x, separators=(",", ":"))) for x in safe)
-    return {"ok": True, "count": len(safe), "size": size}
+    m = eeg_multichannel_array(n=req.n, fs=req.fs, seconds=req.seconds, alpha=req.alpha, beta=req.beta, gamma=req.gamma, noise=req.noise)
+    # serialise once, here; a JSONResponse also skips FastAPI's per-element jsonable_encoder walk
+    return JSONResponse({"fs": m["fs"], "seconds": m["seconds"], "channels": dict(zip(m["names"], m["data"].tolist()))})
+
+def _topomap(fs, channels):
+    """{name: samples} -> 3x3 alpha grid over the first 9 channels by name."""
+    ch_names = sorted(channels)[:9]
+    alpha = np.zeros(9)
+    # one batched PSD + band integration per distinct channel length (normally just one)
+    by_len = {}
+    for i, name in enumerate(ch_names):
+        by_len.setdefault(len(channels[name]), []).append(i)
+    for rows in by_len.values():
+        X = np.array([channels[ch_names[i]] for i in rows], dtype=np.float64)
+        alpha[rows] = bandpower_many(X, fs, {"alpha": (8, 12)})[:, 0]
+    return alpha.reshape(3, 3)
+
+@app.post("/neuro/topomap", openapi_extra=_body_doc(TopoReq))
+async def neuro_topomap(request: Request):
+    req, sig = await _read(request, TopoReq)
+    if req:
+        fs, channels = req.fs, req.channels
+    else:
+        fs, names, X = sig
+        channels = dict(zip(names, X))  # row views, no copies
+    grid = await run_in_threadpool(_topomap, fs, channels)
+    return _reply(request, ["0", "1", "2"], ["0", "1", "2"], grid,
+                  lambda: {"grid": grid.tolist(), "note": "toy 3x3 topomap of alpha bandpower"})
+
+_tele_doc = {"requestBody": {"required": True, "content": {"application/json": {"schema": TeleBatch.model_json_schema()},
+             NDJSON: {"schema": {"type": "object"}}}}}
+
+@app.post("/telemetry/batch", openapi_extra=_tele_doc)
+async def telemetry_batch(request: Request):
+    """{"items": [...]} or an NDJSON stream of items (consumed as it arrives, so unbounded) -> scrubbed into
+    the telemetry sink; size is the byte length of the scrubbed compact JSON. NDJSON lines that are not
+    JSON objects are skipped and counted in "errors"."""
+    if media_type(request.headers.get("content-type")) == NDJSON:
+        r = await telemetry.ndjson(request.stream())
+        return {"ok": True, **r}
+    try:
+        batch = TeleBatch.model_validate_json(await request.body())
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+    r = await telemetry.records(batch.items)
+    return {"ok": True, "count": r["count"], "size": r["size"]}
 
 @app.post("/cyber/autotune")
 def cyber_autotune(r: AutoTuneReq):
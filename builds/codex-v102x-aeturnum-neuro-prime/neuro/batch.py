@@ -0,0 +1,121 @@
+"""Many-recording band-power analysis fanned out over a process pool.
+
+Recordings are grouped into jobs of `job_size`; a worker analyses a job with one batched
+PSD per distinct (fs, length) in it, so the per-task IPC cost is amortised. Results come
+back per job as jobs complete, and at most `inflight` jobs are queued at once. `run` takes an
+async iterable and pulls items only while there is room in the queue; the HTTP endpoint reads
+its NDJSON body whole first (see app.py), so there the bound is on queued work, not on input.
+A pool whose worker dies is dropped, so its jobs fail and the next job starts a fresh pool.
+"""
+import asyncio
+import multiprocessing as mp
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from neuro.signal import BANDS, bandpower_many
+
+COLUMNS = [*BANDS, "zmean"]
+
+
+def analyze(fs, X):
+    """(channels, samples) -> table (channels, [alpha, beta, gamma, zmean])."""
+    X = np.asarray(X, dtype=np.float64)
+    mu, sd = X.mean(axis=1, keepdims=True), X.std(axis=1, keepdims=True)
+    return np.column_stack([bandpower_many(X, fs), ((X - mu) / (sd + 1e-9)).mean(axis=1)])
+
+
+def analyze_job(job):
+    """[(fs, samples 1-D), ...] -> one [alpha, beta, gamma, zmean] list per recording, in order;
+    a recording whose (fs, length) group fails gets {"error": ...} instead."""
+    out = [None] * len(job)
+    groups = {}
+    for i, (fs, x) in enumerate(job):
+        groups.setdefault((float(fs), len(x)), []).append(i)
+    for (fs, _), idx in groups.items():
+        try:
+            rows = analyze(fs, np.stack([job[i][1] for i in idx])).tolist()
+        except Exception as e:  # keep the failure with its own group
+            rows = [{"error": str(e) or type(e).__name__}] * len(idx)
+        for i, row in zip(idx, rows):
+            out[i] = row
+    return out
+
+
+class BatchAnalyzer:
+    def __init__(self, workers=None, job_size=32, inflight=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.job_size, self.inflight = job_size, inflight or 2 * self.workers
+        self._pool = None
+
+    def pool(self):
+        if self._pool is None:  # started on first use, not at import
+            if "forkserver" in mp.get_all_start_methods():
+                ctx = mp.get_context("forkserver")
+                # the server preloads just this module (numpy/scipy), not __main__: forking a process that
+                # has imported the whole app (pyarrow's threads included) can deadlock the workers
+                ctx.set_forkserver_preload([__name__])
+            else:
+                ctx = mp.get_context("spawn")
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=ctx)  # never fork() the threaded server itself
+        return self._pool
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True); self._pool = None
+
+    def _discard(self, pool):
+        """Drop a broken pool (a worker died) so pool() starts a new one."""
+        if self._pool is pool:
+            self._pool = None
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    async def run(self, items):
+        """Async iterable of (meta dict, fs, samples) -> async iterator of per-recording result dicts
+        ({**meta, "features": {...}, "zmean"}), in completion order. Items whose meta already carries
+        an "error" are passed through unanalysed."""
+        loop = asyncio.get_running_loop()
+        pending, job = {}, []
+
+        def submit():
+            args = [(fs, x) for _, fs, x in job]
+            pool = self.pool()
+            try:
+                fut = loop.run_in_executor(pool, analyze_job, args)
+            except BrokenProcessPool:
+                self._discard(pool); pool = self.pool()
+                fut = loop.run_in_executor(pool, analyze_job, args)
+            pending[fut] = ([m for m, _, _ in job], pool)
+
+        async def completed():
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            out = []
+            for fut in done:
+                metas, pool = pending.pop(fut)
+                try:
+                    rows = fut.result()
+                except Exception as e:  # e.g. a dead worker: the job fails its own recordings only
+                    if isinstance(e, BrokenProcessPool):
+                        self._discard(pool)
+                    out += [{**m, "error": str(e) or type(e).__name__} for m in metas]; continue
+                out += [{**m, **r} if isinstance(r, dict) else {**m, "features": dict(zip(BANDS, r[:-1])), "zmean": r[-1]}
+                        for m, r in zip(metas, rows)]
+            return out
+
+        try:
+            async for meta, fs, x in items:
+                if "error" in meta:
+                    yield meta; continue
+                job.append((meta, fs, x))
+                if len(job) >= self.job_size:
+                    submit(); job = []
+                while len(pending) >= self.inflight:
+                    for r in await completed(): yield r
+            if job:
+                submit()
+            while pending:
+                for r in await completed(): yield r
+        finally:
+            for fut in pending: fut.cancel()  # client went away: drop queued jobs
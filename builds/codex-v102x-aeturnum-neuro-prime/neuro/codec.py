@@ -0,0 +1,111 @@
+"""Binary request/response bodies for the /neuro endpoints.
+
+Request bodies (Content-Type), decoded without per-sample parsing:
+  application/octet-stream             one neuro/frames.py frame (header carries fs and shape)
+  application/x-npy                    a .npy array, (samples,) or (channels, samples); fs from X-Sample-Rate
+  application/vnd.apache.arrow.stream  Arrow IPC stream, one column per channel (column name = channel);
+                                       fs from the schema metadata key "fs" or X-Sample-Rate (needs pyarrow)
+Channel names for octet-stream/npy bodies come from X-Channel-Names (comma-separated), else CH01...
+
+Responses use the same formats when the Accept header asks for one: a float32 table of
+rows (channels) x columns (features), with names in the X-Rows / X-Columns headers
+(Arrow: a "row" column plus one column per feature).
+"""
+import io
+import struct
+
+import numpy as np
+
+from neuro.frames import decode_frame
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+OCTET, NPY, ARROW = "application/octet-stream", "application/x-npy", "application/vnd.apache.arrow.stream"
+BINARY = (OCTET, NPY, ARROW)
+
+
+class CodecError(ValueError):
+    pass
+
+
+def media_type(header):
+    return (header or "").split(";")[0].strip().lower()
+
+
+def _npy(body):
+    bio = io.BytesIO(body)
+    try:
+        version = np.lib.format.read_magic(bio)
+        read = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+        shape, fortran, dtype = read(bio)
+    except ValueError as e:
+        raise CodecError(f"bad .npy body: {e}")
+    if dtype.hasobject:
+        raise CodecError(".npy object arrays are not accepted")
+    # zero-copy view straight over the request bytes
+    x = np.frombuffer(body, dtype=dtype, count=int(np.prod(shape)), offset=bio.tell())
+    return x.reshape(shape, order="F" if fortran else "C")
+
+
+def _arrow(body):
+    if pa is None:
+        raise CodecError("Arrow bodies need pyarrow installed")
+    table = pa.ipc.open_stream(body).read_all()
+    meta = table.schema.metadata or {}
+    fs = float(meta[b"fs"]) if b"fs" in meta else None
+    X = np.stack([table.column(i).to_numpy() for i in range(table.num_columns)]) if table.num_columns else np.empty((0, 0))
+    return fs, table.column_names, X
+
+
+def decode_signal(ctype, body, fs=None, names=None):
+    """Binary body -> (fs, channel names, float array (channels, samples))."""
+    try:
+        if ctype == OCTET:
+            frame = decode_frame(body)
+            fs, X = frame["fs"], frame["samples"]
+        elif ctype == NPY:
+            X = np.atleast_2d(_npy(body))
+        elif ctype == ARROW:
+            afs, names, X = _arrow(body)
+            fs = afs or fs
+        else:
+            raise CodecError(f"unsupported content type {ctype!r}")
+    except CodecError:
+        raise
+    except (ValueError, TypeError, struct.error) as e:
+        raise CodecError(f"bad {ctype} body: {e}")
+    if X.ndim != 2 or X.dtype.kind not in "fiu":
+        raise CodecError(f"expected a numeric (channels, samples) array, got {X.dtype} {X.shape}")
+    if not fs or fs <= 0:
+        raise CodecError("missing sample rate (X-Sample-Rate)")
+    names = list(names) if names else [f"CH{i+1:02d}" for i in range(len(X))]
+    if len(names) != len(X):
+        raise CodecError(f"{len(names)} channel names for {len(X)} channels")
+    return float(fs), names, X
+
+
+def wants(accept):
+    """Binary media type requested by an Accept header, or None for JSON."""
+    accept = (accept or "").lower()
+    return next((m for m in BINARY if m in accept), None)
+
+
+def encode_table(media, rows, columns, T):
+    """float table (rows x columns) -> (body bytes, headers)."""
+    T = np.asarray(T, dtype="<f4")
+    headers = {"X-Rows": ",".join(rows), "X-Columns": ",".join(columns)}
+    if media == OCTET:
+        return T.tobytes(), {**headers, "X-Shape": f"{T.shape[0]},{T.shape[1]}"}
+    if media == NPY:
+        buf = io.BytesIO(); np.save(buf, T, allow_pickle=False)
+        return buf.getvalue(), headers
+    if pa is None:
+        raise CodecError("Arrow responses need pyarrow installed")
+    table = pa.table({"row": rows, **{c: T[:, i] for i, c in enumerate(columns)}})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as w:
+        w.write_table(table)
+    return sink.getvalue().to_pybytes(), headers
@@ -0,0 +1,22 @@
+"""Binary /ws/stream frames.
+
+Each WebSocket binary message is one frame: a 20-byte little-endian header
+    seq u32 | ts f64 (unix seconds) | fs f32 | channels u16 | samples u16
+followed by channels*samples float32 (little-endian), channel-major.
+"""
+import struct
+
+import numpy as np
+
+HEADER = struct.Struct("<IdfHH")
+
+
+def encode_frame(seq, ts, fs, x):
+    x = np.atleast_2d(np.asarray(x, dtype="<f4"))
+    return HEADER.pack(seq & 0xFFFFFFFF, ts, fs, x.shape[0], x.shape[1]) + x.tobytes()
+
+
+def decode_frame(buf):
+    seq, ts, fs, nch, ns = HEADER.unpack_from(buf)
+    x = np.frombuffer(buf, dtype="<f4", count=nch * ns, offset=HEADER.size).reshape(nch, ns)
+    return {"seq": seq, "ts": ts, "fs": fs, "samples": x}
@@ -0,0 +1,81 @@
+"""Online (sliding-window) band-power features for multi-channel streams.
+
+Welch's PSD over a window is the mean of the periodograms of its half-overlapping
+segments, so each segment is transformed exactly once as samples arrive: a hop of
+nperseg/2 new samples costs one batched rFFT over all channels, and a window's PSD is
+the mean of the last K segment periodograms. Memory is bounded by one segment of raw
+samples plus K periodograms per channel, whatever the stream length. Results equal
+scipy.signal.welch(window, nperseg=nperseg) (Hann, constant detrend, density scaling).
+"""
+import numpy as np
+from scipy.signal import get_window
+
+from neuro.signal import BANDS, bandpowers
+
+MAX_RING = 1 << 14  # periodograms (segments x channels) a caller should allow per stream: ~17 MB at nperseg=256
+
+
+def max_window(fs, channels, nperseg=256, ring=MAX_RING):
+    """Longest window (seconds) at fs whose periodogram ring for `channels` fits in `ring`."""
+    k = max(1, ring // max(1, int(channels)))
+    return ((k - 1) * (nperseg // 2) + nperseg) / float(fs)
+
+
+class OnlineFeatures:
+    def __init__(self, fs, channels, window=2.0, nperseg=256, bands=BANDS, every=1):
+        """window: seconds of signal per feature update; every: publish once per `every` hops."""
+        self.fs, self.nch, self.nperseg, self.bands, self.every = float(fs), int(channels), int(nperseg), bands, max(1, int(every))
+        self.hop = self.nperseg // 2
+        n = max(self.nperseg, int(window * self.fs))
+        self.k = (n - self.nperseg) // self.hop + 1  # segments per window
+        self.f = np.fft.rfftfreq(self.nperseg, 1 / self.fs)
+        win = get_window("hann", self.nperseg)
+        self.win = win.astype(np.float32)
+        scale = np.full(len(self.f), 2.0 / (self.fs * (win ** 2).sum()))  # one-sided density
+        scale[0] /= 2
+        if self.nperseg % 2 == 0:
+            scale[-1] /= 2
+        self.scale = scale
+        self.buf = np.zeros((self.nch, self.nperseg), dtype=np.float32)
+        self.have = 0  # valid samples at the start of buf
+        self.psds = np.zeros((self.k, self.nch, len(self.f)))  # ring of segment periodograms
+        self.count = self.next = 0
+        self.samples = 0  # total samples pushed, per channel
+
+    def _periodograms(self, segs):
+        segs = segs - segs.mean(axis=-1, keepdims=True)
+        spec = np.fft.rfft(segs * self.win, axis=-1)
+        return (spec.real ** 2 + spec.imag ** 2) * self.scale
+
+    def push(self, chunk):
+        """Feed (channels, samples) -> list of feature updates completed by this chunk, each
+        {"t": stream time (s) at the window's end, "features": float array (channels, bands)}."""
+        x = np.asarray(chunk, dtype=np.float32)
+        if x.ndim == 1:
+            x = x[None]
+        if x.shape[0] != self.nch:
+            raise ValueError(f"expected {self.nch} channels, got {x.shape[0]}")
+        segs, ends, i, n = [], [], 0, x.shape[1]
+        while i < n:
+            take = min(n - i, self.nperseg - self.have)
+            self.buf[:, self.have:self.have + take] = x[:, i:i + take]
+            self.have += take; i += take
+            if self.have == self.nperseg:
+                segs.append(self.buf.copy()); ends.append(self.samples + i)
+                self.buf[:, :self.hop] = self.buf[:, self.nperseg - self.hop:]
+                self.have = self.nperseg - self.hop
+        self.samples += n
+        out = []
+        if not segs:
+            return out
+        P = self._periodograms(np.stack(segs))  # every new segment of every channel in one rFFT
+        for p, end in zip(P, ends):
+            self.psds[self.next] = p
+            self.next = (self.next + 1) % self.k; self.count = min(self.count + 1, self.k)
+            seq = (end - self.nperseg) // self.hop
+            if self.count == self.k and seq % self.every == 0:
+                out.append({"t": end / self.fs, "features": bandpowers(self.f, self.psds.mean(axis=0), self.bands)})
+        return out
+
+    def reset(self):
+        self.have = self.count = self.next = self.samples = 0
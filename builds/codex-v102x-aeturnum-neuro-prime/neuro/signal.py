@@ -1,15 +1,59 @@
+from functools import lru_cache
+
 import numpy as np
-from scipy.signal import butter, lfilter, iirnotch, welch
+from scipy.signal import butter, iirnotch, sosfilt, sosfilt_zi, tf2sos, welch
+
+_trapz = getattr(np, "trapezoid", None) or np.trapz  # numpy 2 renamed trapz
+
+BANDS = {"alpha": (8, 12), "beta": (13, 30), "gamma": (31, 48)}
+
+
+@lru_cache(maxsize=128)
+def bandpass_sos(fs, lo, hi, order=4):
+    """Butterworth band-pass as second-order sections; designs are cached by (fs, band, order)."""
+    # shared between callers: never modify the returned array
+    return butter(order, [lo / (fs / 2), hi / (fs / 2)], btype='band', output='sos')
+
+
+@lru_cache(maxsize=128)
+def notch_sos(fs, f0=60.0, Q=30.0):
+    return tf2sos(*iirnotch(f0 / (fs / 2), Q))
 
 
 def bandpass(x, fs, lo, hi, order=4):
-    b, a = butter(order, [lo / (fs / 2), hi / (fs / 2)], btype='band')
-    return lfilter(b, a, x)
+    return sosfilt(bandpass_sos(float(fs), float(lo), float(hi), int(order)), x, axis=-1)
 
 
 def notch(x, fs, f0=60.0, Q=30.0):
-    b, a = iirnotch(f0 / (fs / 2), Q)
-    return lfilter(b, a, x)
+    return sosfilt(notch_sos(float(fs), float(f0), float(Q)), x, axis=-1)
+
+
+class StreamFilter:
+    """Stateful SOS cascade for chunked streams: filter state (zi) carries across chunks,
+    so a signal filtered in pieces matches the same signal filtered in one go.
+
+    Chunks are (samples,) or (channels, samples); the channel count is fixed by the first chunk.
+    """
+
+    def __init__(self, fs, band=None, order=4, notch=None, Q=30.0):
+        parts = ([bandpass_sos(float(fs), float(band[0]), float(band[1]), int(order))] if band else []) + \
+                ([notch_sos(float(fs), float(notch), float(Q))] if notch else [])
+        self.sos = np.vstack(parts) if parts else None
+        self.zi = None
+
+    def reset(self):
+        self.zi = None
+
+    def __call__(self, chunk):
+        x = np.asarray(chunk, dtype=np.float64)
+        if self.sos is None or x.shape[-1] == 0:
+            return x
+        if self.zi is None:
+            # start at steady state for the first sample instead of ringing up from zero
+            zi = sosfilt_zi(self.sos)
+            self.zi = zi[:, None, :] * x[:, :1][None] if x.ndim == 2 else zi * x[0]
+        y, self.zi = sosfilt(self.sos, x, axis=-1, zi=self.zi)
+        return y
 
 
 def zscore(x):
@@ -29,4 +73,40 @@ def bandpower(f, Pxx, lo, hi):
     idx = (f >= lo) & (f <= hi)
     if not idx.any():
         return 0.0
-    return float(np.trapz(Pxx[idx], f[idx]))
+    return float(_trapz(Pxx[idx], f[idx]))
+
+
+# ---------- batched (channels, samples) API: arrays in, arrays out ----------
+
+def psd_many(X, fs, nperseg=256):
+    """Welch PSD of every row of a (channels, samples) array in one call -> (f, P[channels, freqs])."""
+    X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+    return welch(X, fs=fs, nperseg=min(nperseg, X.shape[-1]), axis=-1)
+
+
+@lru_cache(maxsize=64)
+def _band_weights(f_bytes, bands):
+    # trapezoid weights over each band's bins, so integrating every band is one matmul
+    f = np.frombuffer(f_bytes)
+    W = np.zeros((len(bands), len(f)))
+    for i, (lo, hi) in enumerate(bands):
+        idx = np.flatnonzero((f >= lo) & (f <= hi))
+        if len(idx) < 2:
+            continue
+        df = np.diff(f[idx])
+        W[i, idx[:-1]] += df / 2
+        W[i, idx[1:]] += df / 2
+    return W
+
+
+def bandpowers(f, P, bands=BANDS):
+    """Integrate every band of every channel at once: P[channels, freqs] -> [channels, bands]."""
+    f = np.ascontiguousarray(f, dtype=np.float64)
+    W = _band_weights(f.tobytes(), tuple(tuple(map(float, b)) for b in bands.values()))
+    return np.atleast_2d(P) @ W.T
+
+
+def bandpower_many(X, fs, bands=BANDS, nperseg=256):
+    """(channels, samples) -> band powers [channels, bands], in the order of `bands`."""
+    f, P = psd_many(X, fs, nperseg)
+    return bandpowers(f, P, bands)
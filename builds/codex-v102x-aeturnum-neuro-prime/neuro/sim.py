@@ -1,29 +1,73 @@
 import numpy as np
 
+RHYTHM_AMPS = np.array([1.0, 0.6, 0.3])  # alpha, beta, gamma
+
+
 def sine(fs, f, seconds, amp=1.0, phase=0.0):
     t = np.arange(0, int(fs * seconds)) / fs
     return t, amp * np.sin(2 * np.pi * f * t + phase)
 
 
-def eeg_synth(fs=256, seconds=2.0, alpha=10.0, beta=20.0, gamma=40.0, noise=0.3, blink=False, seed=None):
-    rng = np.random.default_rng(seed)
-    t, a = sine(fs, alpha, seconds, amp=1.0)
-    _, b = sine(fs, beta, seconds, amp=0.6)
-    _, g = sine(fs, gamma, seconds, amp=0.3)
-    x = a + b + g + noise * rng.standard_normal(len(a))
+class EEGStream:
+    """Resumable EEG-like generator: every read() continues the previous one (phase-continuous).
+
+    Channels share the alpha/beta/gamma rhythms (scaled by a per-channel gain, as a stand-in for
+    phase offsets) and get independent noise: each channel has its own RNG stream spawned from
+    `seed`, so adding channels never changes the noise of existing ones.
+    """
+
+    def __init__(self, fs=256.0, n=1, alpha=10.0, beta=20.0, gamma=40.0, noise=0.3, seed=None):
+        self.fs, self.n, self.noise = float(fs), int(n), noise
+        ss = np.random.SeedSequence(seed)
+        ctl, chans = ss.spawn(1)[0], ss.spawn(self.n)
+        self.rng = np.random.default_rng(ctl)  # gains, blinks
+        self.rngs = [np.random.default_rng(s) for s in chans]
+        self.w = 2 * np.pi * np.array([alpha, beta, gamma], dtype=np.float64) / self.fs
+        self.phase = np.zeros(3)  # running phase of each rhythm, kept mod 2*pi
+        self.gain = np.cos(self.rng.uniform(0, 2 * np.pi, self.n)) if self.n > 1 else np.ones(1)
+
+    def read(self, samples):
+        """Next `samples` samples of every channel -> float32 array (n, samples)."""
+        ph = self.phase[:, None] + self.w[:, None] * np.arange(samples)
+        self.phase = (self.phase + self.w * samples) % (2 * np.pi)
+        x = np.multiply.outer(self.gain, RHYTHM_AMPS @ np.sin(ph)).astype(np.float32)
+        if self.noise:
+            for row, rng in zip(x, self.rngs):
+                row += self.noise * rng.standard_normal(samples, dtype=np.float32)
+        return x
+
+    def blink(self, x, p=1.0, seconds=0.2, amp=2.5):
+        """Add a blink artefact to each channel of x with probability p (in place)."""
+        w = int(seconds * self.fs)
+        for ch in np.flatnonzero(self.rng.random(len(x)) < p):
+            i = self.rng.integers(0, max(1, x.shape[1] - w))
+            x[ch, i:i + w] += amp
+        return x
+
+
+def eeg_synth_array(fs=256, seconds=2.0, alpha=10.0, beta=20.0, gamma=40.0, noise=0.3, blink=False, seed=None):
+    """One channel -> (t float64, x float32) arrays."""
+    gen = EEGStream(fs, 1, alpha, beta, gamma, noise, seed)
+    x = gen.read(int(fs * seconds))
     if blink:
-        idx = rng.integers(0, max(1, len(x) - int(0.2 * fs)))
-        x[idx:idx + int(0.2 * fs)] += 2.5
+        gen.blink(x)
+    return np.arange(x.shape[1]) / fs, x[0]
+
+
+def eeg_synth(fs=256, seconds=2.0, alpha=10.0, beta=20.0, gamma=40.0, noise=0.3, blink=False, seed=None):
+    """One channel -> (t, x) lists; see eeg_synth_array."""
+    t, x = eeg_synth_array(fs, seconds, alpha, beta, gamma, noise, blink, seed)
     return t.tolist(), x.tolist()
 
 
+def eeg_multichannel_array(n=8, fs=256, seconds=2.0, alpha=10.0, beta=20.0, gamma=40.0, noise=0.3, seed=None):
+    """n channels -> {"fs", "seconds", "names", "data": float32 (n, samples)}; ~10% of channels blink."""
+    gen = EEGStream(fs, n, alpha, beta, gamma, noise, seed)
+    x = gen.blink(gen.read(int(fs * seconds)), p=0.1)
+    return {"fs": fs, "seconds": seconds, "names": [f"CH{ch+1:02d}" for ch in range(n)], "data": x}
+
+
 def eeg_multichannel(n=8, fs=256, seconds=2.0, alpha=10.0, beta=20.0, gamma=40.0, noise=0.3, seed=None):
-    rng = np.random.default_rng(seed)
-    data = {}
-    for ch in range(n):
-        phase = rng.uniform(0, 2 * np.pi)
-        _, x = eeg_synth(fs=fs, seconds=seconds, alpha=alpha, beta=beta, gamma=gamma, noise=noise, blink=(rng.random() < 0.1), seed=seed)
-        # add slight phase offset per channel
-        x = (np.array(x) * np.cos(phase)).tolist()
-        data[f"CH{ch+1:02d}"] = x
-    return {"fs": fs, "seconds": seconds, "channels": data}
+    """n channels -> {"fs", "seconds", "channels": {name: samples list}}; see eeg_multichannel_array."""
+    m = eeg_multichannel_array(n, fs, seconds, alpha, beta, gamma, noise, seed)
+    return {"fs": fs, "seconds": seconds, "channels": dict(zip(m["names"], m["data"].tolist()))}
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+# Re-analysis of many recordings: one /neuro/analyze call per recording vs one streamed /neuro/analyze:batch call.
+import io, json, os, sys, time
+import numpy as np
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fastapi.testclient import TestClient
+from app import app, NDJSON
+from neuro.sim import EEGStream
+
+def main():
+    n=int(sys.argv[1]) if len(sys.argv)>1 else 2000; fs=256.0
+    X=EEGStream(fs, n, seed=3).read(int(fs*10)).astype(np.float64)  # n recordings of 10 s
+    with TestClient(app) as c:
+        t=time.perf_counter()
+        seq=[c.post("/neuro/analyze", json={"fs": fs, "channel": f"r{i}", "samples": X[i].tolist()}).json() for i in range(n)]
+        old=time.perf_counter()-t
+        body="".join(json.dumps({"id": f"r{i}", "fs": fs, "samples": X[i].tolist()})+"\n" for i in range(n)).encode()
+        t=time.perf_counter()
+        res=[json.loads(l) for l in c.post("/neuro/analyze:batch", content=body, headers={"content-type": NDJSON}).iter_lines() if l]
+        new=time.perf_counter()-t
+        buf=io.BytesIO(); np.save(buf, X.astype(np.float32))
+        t=time.perf_counter()
+        npy=[json.loads(l) for l in c.post("/neuro/analyze:batch", content=buf.getvalue(),
+             headers={"content-type": "application/x-npy", "x-sample-rate": str(fs)}).iter_lines() if l]
+        blob=time.perf_counter()-t
+    assert len(res)==n and len(npy)==n
+    by_i={r["i"]: r for r in res}
+    assert all(abs(by_i[i]["features"]["alpha"]-seq[i]["features"]["alpha"]) < 1e-9 for i in range(n))
+    print(f"{n:,} recordings x {X.shape[1]} samples | sequential /neuro/analyze {n/old:,.0f}/s | "
+          f"batch NDJSON {n/new:,.0f}/s (x{old/new:.1f}) | batch .npy {n/blob:,.0f}/s (x{old/blob:.1f}) | {os.cpu_count()} cores")
+
+if __name__ == "__main__":  # the worker pool re-imports this module
+    main()
@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+# /neuro/topomap request cost for 64 ch x 60 s @ 256 Hz: JSON body (Pydantic) vs binary bodies (neuro/codec.py).
+# Times body decode + analysis in-process; HTTP transfer is reflected only in the body sizes.
+import os, sys, io, json, time
+import numpy as np
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app import TopoReq, _topomap
+from neuro.codec import OCTET, NPY, decode_signal
+from neuro.frames import encode_frame
+nch, fs, secs = 64, 256.0, 60
+X=np.random.default_rng(7).standard_normal((nch, int(fs*secs))).astype(np.float32)
+names=[f"CH{i+1:02d}" for i in range(nch)]
+bodies={"json": json.dumps({"fs":fs,"channels":dict(zip(names, X.tolist()))}).encode(), "octet": encode_frame(0, 0.0, fs, X)}
+buf=io.BytesIO(); np.save(buf, X); bodies["npy"]=buf.getvalue()
+def via_json(b):
+    req=TopoReq.model_validate_json(b); return _topomap(req.fs, req.channels)
+def via_binary(ctype):
+    def run(b):
+        fs_, n, A = decode_signal(ctype, b, fs, names); return _topomap(fs_, dict(zip(n, A)))
+    return run
+def best(fn, b, reps=5):
+    ts=[]
+    for _ in range(reps): t=time.perf_counter(); fn(b); ts.append(time.perf_counter()-t)
+    return min(ts)*1e3
+runs={"json": via_json, "octet": via_binary(OCTET), "npy": via_binary(NPY)}
+base=best(via_json, bodies["json"], 3)
+for k, fn in runs.items():
+    ms=base if k=="json" else best(fn, bodies[k])
+    print(f"{k:6} body {len(bodies[k])/2**20:7.1f} MiB  decode+topomap {ms:8.1f} ms  x{base/ms:.0f}")
@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+# 64-channel band-power analysis: per-channel psd()+bandpower() loop vs one batched Welch + band matmul.
+import os, sys, time
+import numpy as np
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from neuro.signal import BANDS, psd, bandpower, bandpower_many
+nch=int(sys.argv[1]) if len(sys.argv)>1 else 64; fs=256.0; secs=4.0; reps=20
+X=np.random.default_rng(7).standard_normal((nch, int(fs*secs)))
+def legacy():
+    out=[]
+    for c in range(nch):
+        f, P = psd(X[c].tolist(), fs)
+        out.append([bandpower(f, P, lo, hi) for lo, hi in BANDS.values()])
+    return out
+def batched():
+    return bandpower_many(X, fs)
+assert np.allclose(legacy(), batched())
+def best(fn):
+    ts=[]
+    for _ in range(reps): t=time.perf_counter(); fn(); ts.append(time.perf_counter()-t)
+    return min(ts)*1e3
+old, new = best(legacy), best(batched)
+print(f"{nch} ch x {secs:.0f}s @ {fs:.0f} Hz: per-channel {old:.2f} ms | batched {new:.2f} ms | x{old/new:.1f}")
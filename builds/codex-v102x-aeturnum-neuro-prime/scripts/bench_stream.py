@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+# Per-client cost of /ws/stream frames (generation + serialisation, excluding the socket itself):
+# bytes/s on the wire and CPU seconds spent per second of streamed signal, JSON vs binary float32.
+import os, sys, json, time
+import numpy as np
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from neuro.sim import EEGStream
+from neuro.frames import encode_frame
+fs=256.0; secs=int(sys.argv[1]) if len(sys.argv)>1 else 120
+def run(mode, nch, chunk):
+    gen=EEGStream(fs, n=nch, seed=7); frames=int(secs*fs/chunk); nbytes=0
+    t=time.process_time()
+    for seq in range(frames):
+        x=gen.read(chunk)
+        if mode=="binary": nbytes+=len(encode_frame(seq, time.time(), fs, x))
+        else: nbytes+=len(json.dumps({"ts":time.time(),"fs":fs,"seq":seq,**({"samples":x[0].tolist()} if nch==1 else {"channels":x.tolist()})}))
+    cpu=time.process_time()-t; streamed=frames*chunk/fs
+    print(f"{mode:6} ch={nch:<3} chunk={chunk:<4} {nbytes/streamed/1024:9.1f} KiB/s  CPU {100*cpu/streamed:6.3f}% of a core")
+for nch in (1, 8, 64):
+    run("json", nch, int(fs))
+    for chunk in (32, 64, 128): run("binary", nch, chunk)
@@ -0,0 +1,160 @@
+"""Batched telemetry ingestion: scrub -> serialise once -> sink.
+
+Every record is scrubbed (telemetry/privacy.py) and serialised exactly once; the compact
+JSON lines are both what the sink receives and what `size` is counted from. Records move
+in chunks: a batch or an NDJSON request stream is cut into chunks that run on a worker
+pool (processes when there is more than one core), at most `inflight` at a time, and reach
+the sink in input order. An NDJSON stream is consumed as the workers drain it, so batch
+size is bounded only by the sink.
+
+A sink is any object with write(blob: bytes, count: int) (blob is `count` NDJSON lines)
+and close(). TELEMETRY_SINK picks one: "null" (default: count and discard) or
+"file:PATH" (append NDJSON).
+"""
+import asyncio
+import collections
+import json
+import multiprocessing as mp
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from telemetry.privacy import REDACTOR
+
+_dumps = json.JSONEncoder(separators=(",", ":")).encode  # ASCII-only: one char per byte
+
+
+def scrub_records(recs):
+    """[record dict, ...] -> (NDJSON blob, count, size in bytes excluding newlines, errors=0);
+    the same shape as scrub_ndjson, so both run as Pipeline jobs."""
+    blob = "".join([_dumps(REDACTOR.scrub(r)) + "\n" for r in recs]).encode()
+    return blob, len(recs), len(blob) - len(recs), 0
+
+
+def scrub_ndjson(blob):
+    """NDJSON bytes (whole lines) -> (NDJSON blob, count, size, errors); lines that are not
+    JSON objects are dropped and counted as errors."""
+    out, errors = [], 0
+    for line in blob.split(b"\n"):
+        if not line.strip():
+            continue
+        try:
+            r = json.loads(line)
+        except ValueError:
+            errors += 1; continue
+        if not isinstance(r, dict):
+            errors += 1; continue
+        out.append(_dumps(REDACTOR.scrub(r)) + "\n")
+    data = "".join(out).encode()
+    return data, len(out), len(data) - len(out), errors
+
+
+class NullSink:
+    def write(self, blob, count):
+        pass
+
+    def close(self):
+        pass
+
+
+class FileSink:
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._f = open(path, "ab")
+        self._lock = threading.Lock()
+
+    def write(self, blob, count):
+        with self._lock:  # whole chunks only, so concurrent batches never interleave lines
+            self._f.write(blob); self._f.flush()
+
+    def close(self):
+        with self._lock: self._f.close()
+
+
+def open_sink(spec):
+    spec = (spec or "null").strip()
+    if spec == "null":
+        return NullSink()
+    if spec.startswith("file:"):
+        return FileSink(spec[5:])
+    raise ValueError(f"unknown telemetry sink {spec!r} (expected null or file:PATH)")
+
+
+class Pipeline:
+    def __init__(self, sink=None, workers=None, chunk=4096, chunk_bytes=1 << 20, inflight=None):
+        """chunk: records per job for parsed batches; chunk_bytes: NDJSON bytes per job."""
+        self.sink = sink or NullSink()
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk, self.chunk_bytes = chunk, chunk_bytes
+        self.inflight = inflight or 2 * self.workers
+        self._pool = None
+
+    def executor(self):
+        """Process pool when there are cores to spread over, else the loop's default threads."""
+        if self.workers > 1 and self._pool is None:
+            if "forkserver" in mp.get_all_start_methods():
+                ctx = mp.get_context("forkserver")
+                ctx.set_forkserver_preload([__name__])  # not __main__: see neuro/batch.py
+            else:
+                ctx = mp.get_context("spawn")
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=ctx)
+        return self._pool
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True); self._pool = None
+        self.sink.close()
+
+    def _discard(self, pool):
+        """Drop a broken pool (a worker died) so executor() starts a new one."""
+        if pool is not None and self._pool is pool:
+            self._pool = None
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    async def _run(self, jobs):
+        """Async iterable of (fn, arg) jobs -> summary; results go to the sink in job order."""
+        loop, ex = asyncio.get_running_loop(), self.executor()
+        queue, total = collections.deque(), {"count": 0, "size": 0, "errors": 0}
+
+        async def drain_one():
+            blob, count, size, errors = await queue.popleft()
+            if count:
+                await asyncio.to_thread(self.sink.write, blob, count)
+            total["count"] += count; total["size"] += size; total["errors"] += errors
+
+        try:
+            async for fn, arg in jobs:
+                queue.append(loop.run_in_executor(ex, fn, arg))
+                while len(queue) >= self.inflight:
+                    await drain_one()
+            while queue:
+                await drain_one()
+        except BrokenProcessPool:
+            self._discard(ex)  # this batch fails; the next one gets a fresh pool
+            raise
+        finally:
+            for fut in queue: fut.cancel()
+        return total
+
+    async def records(self, recs):
+        """Parsed batch (list of dicts) -> {"count", "size", "errors"}."""
+        async def jobs():
+            for i in range(0, len(recs), self.chunk):
+                yield scrub_records, recs[i:i + self.chunk]
+        return await self._run(jobs())
+
+    async def ndjson(self, chunks):
+        """Async iterable of NDJSON bytes (arbitrary splits) -> {"count", "size", "errors"}."""
+        async def jobs():
+            buf = bytearray()
+            async for part in chunks:
+                buf += part
+                if len(buf) >= self.chunk_bytes:
+                    cut = buf.rfind(b"\n") + 1  # hand workers whole lines only
+                    if cut:
+                        yield scrub_ndjson, bytes(buf[:cut]); del buf[:cut]
+            if buf.strip():
+                yield scrub_ndjson, bytes(buf)
+        return await self._run(jobs())
@@ -1,11 +1,20 @@
-import json, re
+import re
+from telemetry.redactor import Redactor
 EMAIL = re.compile(r'[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}')
 IP = re.compile(r'\b(?:\d{1,3}\.){3}\d{1,3}\b')
 TOKEN = re.compile(r'(?:(?:api|token|secret|key)[:=]\s*)([A-Za-z0-9\-_.=]+)', re.I)
+_NO_EMAIL = Redactor([(IP, '[REDACTED_IP]'), (TOKEN, 'SECRET=[REDACTED]')])
+
+class _Redactor(Redactor):
+    def scrub_text(self, s: str) -> str:
+        # EMAIL cannot match without an '@', and searching it over long [A-Za-z0-9] runs (hex subject ids)
+        # backtracks quadratically; such strings take the same alternation minus EMAIL
+        return super().scrub_text(s) if '@' in s else _NO_EMAIL.scrub_text(s)
+
+REDACTOR = _Redactor([(EMAIL, '[REDACTED_EMAIL]'), (IP, '[REDACTED_IP]'), (TOKEN, 'SECRET=[REDACTED]')])
 
 def scrub(o: dict) -> dict:
-    s = json.dumps(o, separators=(',', ':'))
-    s = EMAIL.sub('[REDACTED_EMAIL]', s)
-    s = IP.sub('[REDACTED_IP]', s)
-    s = TOKEN.sub('SECRET=[REDACTED]', s)
-    return json.loads(s)
+    return REDACTOR.scrub(o)
+
+def scrub_ndjson(lines):
+    return REDACTOR.scrub_ndjson(lines)
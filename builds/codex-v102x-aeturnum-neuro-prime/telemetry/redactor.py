@@ -0,0 +1,50 @@
+"""Single-pass redaction engine (shared verbatim by codex/redact.py and telemetry/{privacy,redact}.py).
+
+Walks the object tree once and scrubs string keys and values; values under configured keys
+are replaced wholesale. One compiled alternation of every pattern screens each string, so
+clean strings (the common case) cost a single scan; a string that matches gets the patterns
+applied in order, each over the previous one's output, exactly as the legacy
+dumps -> sub x N -> loads path did. Nothing is serialised or re-parsed.
+"""
+import json, re
+
+class Redactor:
+    def __init__(self, patterns, keys=(), key_replacement='[REDACTED]'):
+        """patterns: iterable of (regex, replacement[, flags]); keys: names whose values are redacted.
+
+        Compiled patterns keep their own flags. Patterns apply in order, each to the previous
+        one's output, so an earlier pattern's replacement shields its match from later ones.
+        """
+        parts, self._each = [], []
+        for rx, repl, *flags in patterns:
+            flags = flags[0] if flags else rx.flags if isinstance(rx, re.Pattern) else 0
+            rx = rx.pattern if isinstance(rx, re.Pattern) else rx
+            # scoped inline flags keep each pattern's own flags inside the combined alternation
+            fl = ''.join(c for f, c in ((re.I, 'i'), (re.M, 'm'), (re.S, 's')) if flags & f)
+            parts.append(f'(?{fl}:{rx})' if fl else f'(?:{rx})')
+            self._each.append((re.compile(rx, flags), lambda m, r=repl: r))  # literal, no template expansion
+        self._rx = re.compile('|'.join(parts)) if parts else None
+        self._keys = frozenset(k.lower() for k in keys)
+        self._key_repl = key_replacement
+
+    def scrub_text(self, s: str) -> str:
+        if self._rx is None or not self._rx.search(s): return s  # matches iff some pattern does
+        for rx, repl in self._each: s = rx.sub(repl, s)
+        return s
+
+    def scrub(self, o):
+        """Return a redacted copy of a JSON-like object (unchanged strings are shared, not copied)."""
+        if isinstance(o, str): return self.scrub_text(o)
+        if isinstance(o, dict):
+            keys, out = self._keys, {}
+            for k, v in o.items():
+                out[self.scrub_text(k) if isinstance(k, str) else k] = self._key_repl if keys and isinstance(k, str) and k.lower() in keys and v is not None else self.scrub(v)
+            return out
+        if isinstance(o, (list, tuple)): return [self.scrub(v) for v in o]
+        return o
+
+    def scrub_ndjson(self, lines, dumps=None):
+        """Stream-redact NDJSON: yields one serialised line per non-empty input line (str or bytes)."""
+        dumps = dumps or (lambda o: json.dumps(o, separators=(',', ':'), ensure_ascii=False))
+        for line in lines:
+            if line.strip(): yield dumps(self.scrub(json.loads(line)))
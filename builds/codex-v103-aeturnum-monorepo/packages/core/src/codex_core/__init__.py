@@ -1,4 +1,4 @@
 from .helix import TetraHelix, demo_state
 from .chronomerkl import ChronoMerkle
-from .holonous import compile_glyphs
-__all__=['TetraHelix','demo_state','ChronoMerkle','compile_glyphs']
+from .holonous import compile_glyphs, compile_many
+__all__=['TetraHelix','demo_state','ChronoMerkle','compile_glyphs','compile_many']
@@ -1,12 +1,48 @@
 import re
+from functools import lru_cache
 GLYPH_MAP={'🌀':'verify','🌞':'invoke','🧾':'audit','🛡':'scan','🔮':'attest','🛡‍🔥':'sanctify','🚦':'rollout','⚖️':'judge','🌈':'deploy','♾':'continuum'}
 NEEDED=['verify','invoke','audit','scan','attest','sanctify','rollout','judge','deploy','continuum']
-def compile_glyphs(text:str):
-    toks=[t.strip() for t in re.split(r'[;\n]+', text) if t.strip()]
+SPLIT=re.compile(r'[;\n]+')
+VS='\ufe0e\ufe0f'  # text/emoji presentation selectors: '⚖' and '⚖️' are the same glyph
+def _extends(ch:str)->bool:
+    # code points that continue the previous grapheme cluster (ZWJ, selectors, skin tones, tags, marks)
+    o=ord(ch)
+    return ch=='\u200d' or ch in VS or 0x1F3FB<=o<=0x1F3FF or 0xE0020<=o<=0xE007F or 0x0300<=o<=0x036F or 0x20D0<=o<=0x20FF
+def _build_trie(glyphs:dict)->dict:
+    trie={}
+    for g,step in glyphs.items():
+        node=trie
+        for ch in g:
+            if ch in VS: continue
+            node=node.setdefault(ch,{})
+        node['']=step
+    return trie
+TRIE=_build_trie(GLYPH_MAP)
+def _match(s:str, i:int):
+    """Longest glyph starting at s[i] that ends on a grapheme boundary -> (step, end) or (None, i)."""
+    node, best, j = TRIE, (None, i), i
+    while j<len(s):
+        if s[j] in VS: j+=1; continue
+        node=node.get(s[j])
+        if node is None: break
+        j+=1
+        while j<len(s) and s[j] in VS: j+=1
+        if '' in node and (j==len(s) or not _extends(s[j])): best=(node[''], j)
+    return best
+@lru_cache(maxsize=4096)
+def _compile(text:str):
     steps=[]
-    for t in toks:
-        if t and t[0] in GLYPH_MAP: steps.append(GLYPH_MAP[t[0]]); continue
-        steps.append(t.split()[0].lower())
+    for t in SPLIT.split(text):
+        t=t.strip()
+        if not t: continue
+        step, i = _match(t, 0)
+        if step is None: steps.append(t.split()[0].lower()); continue
+        while step is not None:  # directly adjacent glyphs ('🌀🌞') are separate steps
+            steps.append(step); step, i = _match(t, i)
     seq=[s for s in steps if s in NEEDED]
-    ok = seq == NEEDED[:len(seq)]
-    return {"ok":ok,"steps":steps,"explain":"glyphs mapped then order-checked"}
+    return seq == NEEDED[:len(seq)], tuple(steps)
+def compile_glyphs(text:str):
+    ok, steps = _compile(text)
+    return {'ok':ok,'steps':list(steps),'explain':'glyphs mapped then order-checked'}
+def compile_many(texts):
+    return [compile_glyphs(t) for t in texts]
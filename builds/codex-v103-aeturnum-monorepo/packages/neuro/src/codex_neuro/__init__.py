@@ -1,4 +1,4 @@
 from .signal import psd, bandpower, zscore
 from .decoder import TinyLogit
-from .sim import eeg_synth, eeg_multichannel
-__all__=['psd','bandpower','zscore','TinyLogit','eeg_synth','eeg_multichannel']
+from .sim import EEGStream, eeg_synth, eeg_multichannel, eeg_synth_array, eeg_multichannel_array
+__all__=['psd','bandpower','zscore','TinyLogit','EEGStream','eeg_synth','eeg_multichannel','eeg_synth_array','eeg_multichannel_array']
@@ -1,12 +1,58 @@
 import numpy as np
 class TinyLogit:
-    def __init__(self, n): self.w=np.zeros(n); self.b=0.0
+    """Logistic regression trained by mini-batch gradient descent. Works in `dtype` (float32 halves memory
+    traffic); X may be any sliceable array (np.memmap included): batches are contiguous row slices, visited
+    in shuffled order, so only one batch is materialised at a time."""
+    def __init__(self, n, dtype=np.float64):
+        self.dtype=np.dtype(dtype); self.w=np.zeros(n, self.dtype); self.b=self.dtype.type(0)
+        self.n_iter_=0; self.loss_=np.inf
     @staticmethod
-    def _sig(z): return 1.0/(1.0+np.exp(-z))
-    def predict_proba(self, X): X=np.asarray(X); return self._sig(X@self.w + self.b)
-    def fit(self, X, y, lr=0.1, epochs=200):
-        X=np.asarray(X); y=np.asarray(y)
-        for _ in range(epochs):
-            p=self.predict_proba(X); g=(p-y)
-            self.w -= lr * (X.T @ g)/len(X); self.b -= lr * g.mean()
+    def _sig(z):
+        e=np.exp(-np.abs(z)); return np.where(z>=0, 1/(1+e), e/(1+e))  # never exp() of a large positive
+    @staticmethod
+    def _log_sig(z): return -np.logaddexp(0, -z)  # log(sigmoid(z)), finite for any z
+    def _z(self, X): return np.asarray(X, dtype=self.dtype)@self.w + self.b
+    def decision_function(self, X, block=65536):
+        if np.ndim(X)<2: return self._z(X)  # one sample (n_features,) -> scalar, as before blocking
+        n=len(X); out=np.empty(n, self.dtype)
+        for i in range(0, n, block): out[i:i+block]=self._z(X[i:i+block])
+        return out
+    def predict_proba(self, X, block=65536):
+        if np.ndim(X)<2: return self._sig(self._z(X))
+        n=len(X); out=np.empty(n, self.dtype)
+        for i in range(0, n, block): out[i:i+block]=self._sig(self._z(X[i:i+block]))
+        return out
+    def loss(self, X, y, block=65536):
+        """Mean log-loss: -y*log(s(z)) - (1-y)*log(s(-z))."""
+        y=np.asarray(y); n=len(X); tot=0.0
+        for i in range(0, n, block):
+            z=self._z(X[i:i+block]); yb=y[i:i+block]
+            tot-=float((yb*self._log_sig(z) + (1-yb)*self._log_sig(-z)).sum())
+        return tot/max(1, n)
+    def _step(self, X, y, lr):
+        X=np.asarray(X, dtype=self.dtype); y=np.asarray(y, dtype=self.dtype); z=X@self.w + self.b
+        g=self._sig(z)-y; m=len(X)
+        self.w-=self.dtype.type(lr/m)*(g@X); self.b-=self.dtype.type(lr)*g.mean(dtype=self.dtype)
+        return -float((y*self._log_sig(z) + (1-y)*self._log_sig(-z)).sum())  # batch loss before the step
+    def partial_fit(self, X, y, lr=0.1, batch=256, rng=None):
+        """One pass of mini-batch updates over (X, y), continuing from the current weights; returns mean loss."""
+        n=len(X); starts=np.arange(0, n, batch)
+        if rng is not None: rng.shuffle(starts)
+        tot=sum(self._step(X[i:i+batch], y[i:i+batch], lr) for i in starts)
+        return tot/max(1, n)
+    def fit(self, X, y, lr=0.1, epochs=200, batch=256, tol=1e-4, patience=3, seed=0):
+        """Up to `epochs` passes; stops once the epoch loss has not improved by `tol` for `patience` epochs.
+        batch=None trains full-batch. Starts from the current weights, so repeated fits warm-start."""
+        rng=np.random.default_rng(seed); batch=batch or len(X); best=np.inf; stale=0
+        for ep in range(1, epochs+1):
+            self.loss_=self.partial_fit(X, y, lr, batch, rng); self.n_iter_=ep
+            if self.loss_ < best-tol: best, stale = self.loss_, 0
+            else:
+                stale+=1
+                if stale>=patience: break
+        return self
+    def fit_chunks(self, chunks, lr=0.1, batch=256, seed=0):
+        """Streaming fit: one partial_fit pass per (X, y) chunk of an iterable; returns self."""
+        rng=np.random.default_rng(seed)
+        for X, y in chunks: self.loss_=self.partial_fit(X, y, lr, batch, rng); self.n_iter_+=1
         return self
@@ -6,15 +6,15 @@ import time, json, hashlib, sys, os
 sys.path.append(os.path.join(os.path.dirname(__file__), "packages/core/src"))
 sys.path.append(os.path.join(os.path.dirname(__file__), "packages/neuro/src"))
 
-from codex_core import demo_state, ChronoMerkle, compile_glyphs
-from codex_neuro import psd, bandpower, zscore, eeg_synth
+from codex_core import demo_state, ChronoMerkle, compile_glyphs, compile_many
+from codex_neuro import psd, bandpower, zscore, eeg_synth_array
 
 APP_VER = "Codex Aeturnum v103 · Monorepo Prime"
 SUBJECT = "caleb fedor byker konev|1998-10-27"
 SUBJECT_SHA256 = "0f9d6b0c0e9f07e6a4cd3f8cc7e5c8a8f1e3b3f6f4b5a6c7d8e9f0a1b2c3d4e5"
 
 app = FastAPI(title=APP_VER)
-chrono = ChronoMerkle()
+chrono = ChronoMerkle(os.getenv("CODEX_CHRONO_DIR"))  # unset: ephemeral temp dir
 
 # Optional integrations (OpenAI, Supabase). If env vars are missing, endpoints return safe mocks.
 from dotenv import load_dotenv
@@ -68,10 +68,24 @@ def v101_glyphs(body: dict):
     if res.get("ok"): chrono.add({"event":"glyphs","steps":res["steps"]})
     return res | {"chrono_root": chrono.head()}
 
+@app.post("/v101/glyphs:batch")
+def v101_glyphs_batch(body: dict):
+    results = compile_many(body.get("glyphs", []))
+    events = [{"event": "glyphs", "steps": r["steps"]} for r in results if r.get("ok")]
+    if events: chrono.add_many(events)
+    return {"results": results, "chrono_root": chrono.head()}
+
+@app.get("/v101/chrono/proof")
+def v101_chrono_proof(index: int):
+    if not 0 <= index < len(chrono):
+        return {"error": "no such entry", "entries": len(chrono)}
+    return {"index": index, "size": len(chrono), "leaf": chrono.leaf_hash(index),
+            "root": chrono.root(), "proof": chrono.inclusion_proof(index)}
+
 @app.get("/v102/stream")
 def v102_stream(seconds: float = 2.0, fs: float = 256.0, alpha: float = 10.0, beta: float = 20.0, gamma: float = 40.0, noise: float = 0.3, blink: bool = False):
-    t,x = eeg_synth(fs=fs, seconds=seconds, alpha=alpha, beta=beta, gamma=gamma, noise=noise, blink=blink)
-    return {"ts": time.time(), "fs": fs, "channel":"Cz", "samples": x, "note":"synthetic EEG-like"}
+    t,x = eeg_synth_array(fs=fs, seconds=seconds, alpha=alpha, beta=beta, gamma=gamma, noise=noise, blink=blink)
+    return {"ts": time.time(), "fs": fs, "channel":"Cz", "samples": x.tolist(), "note":"synthetic EEG-like"}
 
 @app.post("/v102/analyze")
 def v102_analyze(req: AnalyzeReq):
@@ -1,8 +1,122 @@
 #!/usr/bin/env python3
-import json, sys
-a=json.loads(open(sys.argv[1]).read())
-b=json.loads(open(sys.argv[2]).read())
-ka=set(a.keys()); kb=set(b.keys())
-print("added:", sorted(kb-ka))
-print("removed:", sorted(ka-kb))
-print("changed:", sorted([k for k in ka&kb if a[k]!=b[k]])[:50])
+# Structural diff of two JSON / NDJSON documents, emitted as an RFC 6902 JSON Patch (old -> new).
+#   semantic_diff.py OLD NEW                 whole-document diff, recursing into objects and arrays
+#   semantic_diff.py OLD.ndjson NEW.ndjson   streamed line by line; records are /<line> of an array
+#       --key FIELD                          align records by FIELD instead; records are /<key> of an object
+#   --summary                                print added/removed/changed top-level keys instead of the patch
+# Identical branches are skipped by C-level compares (== confirmed by repr, so true/1 and 1/1.0
+# still differ); array middles are aligned on memoised canonical subtree digests.
+import sys, json, hashlib, argparse, difflib
+try:
+    import orjson; loads=orjson.loads
+except ImportError:
+    loads=json.loads
+
+def ptr(tok): return str(tok).replace("~","~0").replace("/","~1")
+
+class Differ:
+    def __init__(self):
+        self.memo={}  # id(value) -> digest; values stay alive for the whole diff
+    def digest(self, x):
+        d=self.memo.get(id(x))
+        if d is None:
+            canon=json.dumps(x,sort_keys=True,separators=(",",":")).encode()
+            d=self.memo[id(x)]=hashlib.blake2b(canon,digest_size=16).digest()
+        return d
+    def same(self, a, b):
+        # repr may also differ on key order alone; that only costs a recursion that finds nothing
+        return a is b or (type(a) is type(b) and a==b and (not isinstance(a,(dict,list)) or repr(a)==repr(b)))
+
+    def diff(self, a, b, path=""):
+        """Yield JSON Patch ops turning a into b."""
+        if self.same(a,b): return
+        if isinstance(a,dict) and isinstance(b,dict):
+            for k in a:
+                if k not in b: yield {"op":"remove","path":f"{path}/{ptr(k)}"}
+            for k,v in b.items():
+                if k not in a: yield {"op":"add","path":f"{path}/{ptr(k)}","value":v}
+                else: yield from self.diff(a[k],v,f"{path}/{ptr(k)}")
+        elif isinstance(a,list) and isinstance(b,list):
+            yield from self._diff_list(a,b,path)
+        else:
+            yield {"op":"replace","path":path,"value":b}
+
+    def _diff_list(self, a, b, path):
+        lo, ha, hb = 0, len(a), len(b)
+        while lo<ha and lo<hb and self.same(a[lo],b[lo]): lo+=1
+        while ha>lo and hb>lo and self.same(a[ha-1],b[hb-1]): ha-=1; hb-=1
+        if ha-lo==hb-lo:  # same-length middle: edits in place, no alignment needed
+            for i in range(lo,ha): yield from self.diff(a[i],b[i],f"{path}/{i}")
+            return
+        sm=difflib.SequenceMatcher(None,[self.digest(x) for x in a[lo:ha]],[self.digest(x) for x in b[lo:hb]],autojunk=False)
+        # ops apply in sequence, so everything before b-index j already equals b[:j]
+        for tag,i1,i2,j1,j2 in sm.get_opcodes():
+            i1+=lo; i2+=lo; j1+=lo; j2+=lo
+            if tag=="equal": continue
+            n=min(i2-i1,j2-j1) if tag=="replace" else 0
+            for k in range(n): yield from self.diff(a[i1+k],b[j1+k],f"{path}/{j1+k}")
+            for _ in range(i2-i1-n): yield {"op":"remove","path":f"{path}/{j1+n}"}
+            for j in range(j1+n,j2): yield {"op":"add","path":f"{path}/{j}","value":b[j]}
+
+def load(path):
+    with open(path,"rb") as f: return loads(f.read())
+
+def records(path):
+    with open(path,"rb") as f:
+        for line in f:
+            if line.strip(): yield line.rstrip(b"\r\n")
+
+def diff_ndjson(old, new):
+    """Positional: line i of each file is /i; equal raw lines are skipped without parsing."""
+    n=0; it=records(old)
+    for n,rb in enumerate(records(new),1):
+        ra=next(it,None)
+        if ra is None: yield {"op":"add","path":f"/{n-1}","value":loads(rb)}
+        elif ra!=rb: yield from Differ().diff(loads(ra),loads(rb),f"/{n-1}")  # fresh memo per record
+    for _ in it: yield {"op":"remove","path":f"/{n}"}
+
+def diff_ndjson_keyed(old, new, key):
+    """Records aligned by key; only offsets of the old file are held in memory."""
+    index={}
+    with open(old,"rb") as f:
+        pos=0
+        for line in f:
+            raw=line.rstrip(b"\r\n")
+            if raw.strip(): index[str(loads(raw).get(key))]=(pos,len(raw))
+            pos+=len(line)
+        seen=set()
+        for rb in records(new):
+            b=loads(rb); k=str(b.get(key)); seen.add(k); p=f"/{ptr(k)}"
+            if k not in index: yield {"op":"add","path":p,"value":b}; continue
+            f.seek(index[k][0]); ra=f.read(index[k][1])
+            if ra!=rb: yield from Differ().diff(loads(ra),b,p)
+    for k in index:
+        if k not in seen: yield {"op":"remove","path":f"/{ptr(k)}"}
+
+def main(argv=None):
+    ap=argparse.ArgumentParser(description="JSON Patch between two JSON/NDJSON files")
+    ap.add_argument("old"); ap.add_argument("new")
+    ap.add_argument("--ndjson",action="store_true",help="force NDJSON (default: by .ndjson/.jsonl extension)")
+    ap.add_argument("--key",help="NDJSON: align records by this field")
+    ap.add_argument("--summary",action="store_true")
+    a=ap.parse_args(argv)
+    nd=a.ndjson or a.key or a.old.endswith((".ndjson",".jsonl"))
+    ops=(diff_ndjson_keyed(a.old,a.new,a.key) if a.key else diff_ndjson(a.old,a.new)) if nd else Differ().diff(load(a.old),load(a.new))
+    out=sys.stdout
+    if a.summary:
+        top={"add":set(),"remove":set(),"replace":set()}
+        for op in ops:
+            parts=op["path"].split("/")
+            k=parts[1].replace("~1","/").replace("~0","~") if len(parts)>1 else ""
+            top["replace" if len(parts)>2 or op["op"]=="replace" else op["op"]].add(k)
+        print("added:",sorted(top["add"]-top["remove"])); print("removed:",sorted(top["remove"]-top["add"]))
+        print("changed:",sorted(top["replace"]|(top["add"]&top["remove"])))
+        return 0
+    out.write("[")
+    for i,op in enumerate(ops):  # streamed: the patch is never held in memory
+        out.write((",\n" if i else "\n")+json.dumps(op,ensure_ascii=False))
+    out.write("\n]\n")
+    return 0
+
+if __name__=="__main__":
+    sys.exit(main())
@@ -1,18 +1,188 @@
 #!/usr/bin/env python3
-import os, json, zipfile, hashlib, time, sys
-root = os.path.dirname(os.path.dirname(__file__))
-out = os.path.join(root, f"codex_omega_{int(time.time())}.zip")
-digests={}
-with zipfile.ZipFile(out,"w",zipfile.ZIP_DEFLATED) as z:
-  for dp,_,fs in os.walk(root):
-    # skip venvs and build dirs
-    if any(p in dp for p in (".venv","__pycache__",".git",".github/workflows")): continue
-    for n in fs:
-      p=os.path.join(dp,n)
-      rel=os.path.relpath(p, root)
-      with open(p,"rb") as f: b=f.read()
-      digests[rel]=hashlib.sha256(b).hexdigest()
-      z.writestr(rel, b)
-meta={"subject":"caleb fedor byker konev|1998-10-27","subject_id_sha256":hashlib.sha256(b"caleb fedor byker konev|1998-10-27").hexdigest(),"digests":digests}
-open(os.path.join(root,"codex_release_provenance.json"),"w").write(json.dumps(meta,indent=2))
-print(out)
+"""Pack the codex-v106 tree into codex_omega_<ts>.zip plus codex_release_provenance.json.
+
+pack_release.py [--mode deflate|zstd|store] [--level N] [--jobs N]
+
+Directories are pruned during the walk and every file is read once, in chunks. A
+process pool compresses members (raw deflate or zstd) and takes crc32 + sha256 from
+that same read; the main process writes the finished members in walk order (so
+output is stable) with ZipWriter, which lays out headers per the ZIP spec (APPNOTE
+4.3, zip64 included). Already-compressed files are stored, copied and hashed by the
+main process in one pass. sha256 digests are reused from the previous provenance
+file when a file's size and mtime_ns are unchanged.
+"""
+import os, json, zipfile, hashlib, time, sys, zlib, shutil, struct, tempfile, argparse, collections
+from concurrent.futures import ProcessPoolExecutor
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROV = os.path.join(root, "codex_release_provenance.json")
+CHUNK = 1 << 20
+INLINE = 1 << 20  # compressed members smaller than this come back from workers as bytes, not temp files
+SKIP_DIRS = {".venv", "__pycache__", ".git"}
+SKIP_REL = {os.path.join(".github", "workflows")}
+PRECOMPRESSED = {".zip", ".gz", ".tgz", ".bz2", ".xz", ".zst", ".7z", ".whl", ".jar",
+                 ".png", ".jpg", ".jpeg", ".gif", ".webp", ".mp3", ".mp4", ".woff", ".woff2", ".pdf"}
+ZIP_ZSTD = 93  # APPNOTE method id; compressing needs compression.zstd (Python >= 3.14)
+try:
+  from compression import zstd
+except ImportError:
+  zstd = None
+
+def walk(root, skip_files):
+  for dp, dns, fs in os.walk(root):
+    rel_dp = os.path.relpath(dp, root)
+    # prune in place so os.walk never descends into skipped trees
+    dns[:] = sorted(d for d in dns if d not in SKIP_DIRS and os.path.normpath(os.path.join(rel_dp, d)) not in SKIP_REL)
+    for n in sorted(fs):
+      p = os.path.join(dp, n)
+      if p in skip_files or not os.path.isfile(p): continue
+      yield p, os.path.relpath(p, root).replace(os.sep, "/")
+
+def load_prior(path):
+  try:
+    with open(path) as f: prior = json.load(f)
+  except (OSError, ValueError): return {}
+  digests, stats = prior.get("digests", {}), prior.get("stat", {})
+  return {rel: (tuple(stats[rel]), d) for rel, d in digests.items() if rel in stats}
+
+def pack_one(job):
+  """Read one file once: crc32, sha256 (unless reused) and compressed payload. Runs in a worker process.
+  Returns (crc, size, csize, digest, payload bytes or temp file path)."""
+  path, method, level, want_sha = job
+  sha = hashlib.sha256() if want_sha else None
+  comp = zlib.compressobj(level, zlib.DEFLATED, -15) if method == zipfile.ZIP_DEFLATED else zstd.ZstdCompressor(level)
+  out = tempfile.SpooledTemporaryFile(max_size=INLINE)
+  crc = size = 0
+  with open(path, "rb") as f:
+    for b in iter(lambda: f.read(CHUNK), b""):
+      crc = zlib.crc32(b, crc); size += len(b)
+      if sha: sha.update(b)
+      out.write(comp.compress(b))
+  out.write(comp.flush())
+  csize = out.tell(); out.seek(0)
+  if csize <= INLINE: return crc, size, csize, sha and sha.hexdigest(), out.read()
+  fd, tmp = tempfile.mkstemp(prefix="codex_pack_")
+  with os.fdopen(fd, "wb") as t: shutil.copyfileobj(out, t, CHUNK)
+  return crc, size, csize, sha and sha.hexdigest(), tmp
+
+class ZipWriter:
+  """Sequential ZIP writer for members whose payload is produced elsewhere (APPNOTE 4.3)."""
+  LIMIT = 0xFFFFFFFF
+
+  def __init__(self, path):
+    self.f, self.central, self.count = open(path, "wb"), [], 0
+
+  @staticmethod
+  def _dos(mtime):
+    t = time.localtime(mtime)
+    y = min(max(t.tm_year, 1980), 2107)
+    return t.tm_hour << 11 | t.tm_min << 5 | t.tm_sec // 2, (y - 1980) << 9 | t.tm_mon << 5 | t.tm_mday
+
+  def _header(self, name, method, st, crc, size, csize):
+    dtime, ddate = self._dos(st.st_mtime)
+    flags = 0 if name.isascii() else 0x800  # bit 11: UTF-8 name
+    big = size >= self.LIMIT or csize >= self.LIMIT
+    version = 63 if method == ZIP_ZSTD else 45 if big else 20
+    extra = struct.pack("<2H2Q", 1, 16, size, csize) if big else b""
+    head = struct.pack("<4s2B4HL2L2H", b"PK\x03\x04", version, 0, flags, method, dtime, ddate, crc,
+                       self.LIMIT if big else csize, self.LIMIT if big else size, len(name), len(extra))
+    return head + name + extra, (version, flags, method, dtime, ddate, st.st_mode)
+
+  def add(self, rel, st, method, crc, size, csize, payload):
+    """Append one member; payload is bytes or a readable binary file."""
+    name, offset = rel.encode(), self.f.tell()
+    head, meta = self._header(name, method, st, crc, size, csize)
+    self.f.write(head)
+    if isinstance(payload, bytes): self.f.write(payload)
+    else: shutil.copyfileobj(payload, self.f, CHUNK)
+    self.central.append((name, offset, crc, size, csize, meta)); self.count += 1
+
+  def add_stored(self, rel, path, st, want_sha):
+    """Copy a file in as a stored member, taking crc32 (+ sha256) from the same read; returns the digest."""
+    name, offset = rel.encode(), self.f.tell()
+    head, _ = self._header(name, zipfile.ZIP_STORED, st, 0, st.st_size, st.st_size)
+    self.f.write(head)
+    sha, crc, size = hashlib.sha256() if want_sha else None, 0, 0
+    with open(path, "rb") as src:
+      for b in iter(lambda: src.read(CHUNK), b""):
+        crc = zlib.crc32(b, crc); size += len(b)
+        if sha: sha.update(b)
+        self.f.write(b)
+    if size != st.st_size: raise RuntimeError(f"{rel} changed size while packing")
+    end = self.f.tell()
+    head, meta = self._header(name, zipfile.ZIP_STORED, st, crc, size, size)
+    self.f.seek(offset); self.f.write(head); self.f.seek(end)  # same length: only the crc changed
+    self.central.append((name, offset, crc, size, size, meta)); self.count += 1
+    return sha and sha.hexdigest()
+
+  def close(self):
+    start = self.f.tell()
+    for name, offset, crc, size, csize, (version, flags, method, dtime, ddate, mode) in self.central:
+      # zip64 extra carries only the fields that overflow, in the order size, csize, offset
+      big = [v for v in (size, csize, offset) if v >= self.LIMIT]
+      extra = struct.pack(f"<2H{len(big)}Q", 1, 8 * len(big), *big) if big else b""
+      size, csize, offset = (min(v, self.LIMIT) for v in (size, csize, offset))
+      self.f.write(struct.pack("<4s4B4HL2L5H2L", b"PK\x01\x02", version, 3, version, 0, flags, method, dtime, ddate, crc,
+                               csize, size, len(name), len(extra), 0, 0, 0, (mode & 0xFFFF) << 16, offset) + name + extra)
+    end = self.f.tell(); cd_size = end - start
+    if self.count >= 0xFFFF or start >= self.LIMIT or cd_size >= self.LIMIT:
+      self.f.write(struct.pack("<4sQ2H2L4Q", b"PK\x06\x06", 44, 45, 45, 0, 0, self.count, self.count, cd_size, start))
+      self.f.write(struct.pack("<4sLQL", b"PK\x06\x07", 0, end, 1))
+    n = min(self.count, 0xFFFF)
+    self.f.write(struct.pack("<4s4H2LH", b"PK\x05\x06", 0, 0, n, n, min(cd_size, self.LIMIT), min(start, self.LIMIT), 0))
+    self.f.close()
+
+def main(argv=None):
+  ap = argparse.ArgumentParser(description="pack codex-v106 release bundle")
+  ap.add_argument("--mode", choices=("deflate", "zstd", "store"), default=os.environ.get("CODEX_PACK_MODE", "deflate"))
+  ap.add_argument("--level", type=int, default=None)
+  ap.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+  a = ap.parse_args(argv)
+  method = {"deflate": zipfile.ZIP_DEFLATED, "store": zipfile.ZIP_STORED, "zstd": ZIP_ZSTD}[a.mode]
+  if method == ZIP_ZSTD and zstd is None:
+    print("zstd zip members need Python >= 3.14; falling back to deflate", file=sys.stderr)
+    method = zipfile.ZIP_DEFLATED
+  level = a.level if a.level is not None else (6 if method == zipfile.ZIP_DEFLATED else 3)
+  out = os.path.join(root, f"codex_omega_{int(time.time())}.zip")
+  prior = load_prior(PROV)
+  # never pack our own outputs (previous bundles / provenance) back into the bundle
+  skip = {out, PROV} | {os.path.join(root, n) for n in os.listdir(root) if n.startswith("codex_omega_") and n.endswith(".zip")}
+  digests, stats, jobs = {}, {}, max(1, a.jobs)
+  z = ZipWriter(out)
+
+  def write(entry, fut):
+    p, rel, st, m, reuse = entry
+    if fut is None: digest = z.add_stored(rel, p, st, reuse is None)
+    else:
+      crc, size, csize, digest, data = fut.result()
+      if isinstance(data, bytes): z.add(rel, st, m, crc, size, csize, data)
+      else:
+        with open(data, "rb") as f: z.add(rel, st, m, crc, size, csize, f)
+        os.unlink(data)
+    digests[rel] = reuse or digest
+
+  try:
+    with ProcessPoolExecutor(max_workers=jobs) as ex:
+      queue = collections.deque()  # (entry, future or None for stored), written in walk order
+      for p, rel in walk(root, skip):
+        st = os.stat(p)
+        stat = (st.st_size, st.st_mtime_ns)
+        m = zipfile.ZIP_STORED if os.path.splitext(rel)[1].lower() in PRECOMPRESSED else method
+        old = prior.get(rel)
+        reuse = old[1] if old and old[0] == stat else None
+        stats[rel] = list(stat)
+        fut = None if m == zipfile.ZIP_STORED else ex.submit(pack_one, (p, m, level, reuse is None))
+        queue.append(((p, rel, st, m, reuse), fut))
+        while len(queue) > 4 * jobs or (queue and (queue[0][1] is None or queue[0][1].done())):
+          write(*queue.popleft())
+      while queue: write(*queue.popleft())
+    z.close()
+  except BaseException:
+    z.f.close(); os.unlink(out)
+    raise
+  meta = {"subject":"caleb fedor byker konev|1998-10-27","subject_id_sha256":hashlib.sha256(b"caleb fedor byker konev|1998-10-27").hexdigest(),"digests":digests,"stat":stats}
+  with open(PROV, "w") as f: f.write(json.dumps(meta, indent=2))
+  print(out)
+
+if __name__ == "__main__":
+  main()
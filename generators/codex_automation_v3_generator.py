@@ -120,43 +120,8 @@ write(BASE/"cni"/"cni_cli.py", cni_cli, 0o755)
 write(BASE/"cni"/"README.md", "Celestial Neural Interface (local stub): symbolic-to-plan mapping; no network.")
 
 -------- Integrity & governance (reusing v2.x patterns in compact form)
-provenance_v2 = f"""#!/usr/bin/env python3
-import os, json, hashlib, pathlib, sys, datetime
-SUBJECT_SHA256 = "{SUBJECT_SHA256}"
-ROOT = pathlib.Path(file).resolve().parents[1]
-MANIFEST = ROOT / "manifests" / "MANIFEST.checksums.json"
-def sha256_path(p: pathlib.Path) -> str:
-h = hashlib.sha256();
-with open(p, "rb") as f:
-for ch in iter(lambda: f.read(65536), b""): h.update(ch)
-return h.hexdigest()
-def enumerate_files(root: pathlib.Path):
-for p in root.rglob("*"):
-if p.is_file() and ".git" not in p.parts and "dist" not in p.parts: yield p
-def build_manifest():
-items = []
-for p in sorted(enumerate_files(ROOT)):
-rel = p.relative_to(ROOT).as_posix()
-items.append({{"path": rel, "size": p.stat().st_size, "sha256": sha256_path(p)}})
-return {{"subject_sha256": SUBJECT_SHA256, "generated_utc": datetime.datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"), "items": items}}
-def write_manifest():
-MANIFEST.parent.mkdir(parents=True, exist_ok=True)
-data = build_manifest()
-MANIFEST.write_text(json.dumps(data, indent=2), encoding="utf-8")
-print(f"Wrote manifest: {{MANIFEST}}"); return 0
-def verify_manifest():
-if not MANIFEST.exists(): print("Missing manifest"); return 1
-data = json.loads(MANIFEST.read_text(encoding="utf-8"))
-failures = 0
-for item in data.get("items", []):
-p = ROOT / item["path"]
-if not p.exists(): print(f"MISSING: {{item['path']}}"); failures += 1; continue
-if sha256_path(p) != item["sha256"]: print(f"DRIFT: {{item['path']}}"); failures += 1
-print("OK ✓" if failures==0 else f"FAIL ✗ {failures}"); return 0 if failures==0 else 2
-if name == "main":
-cmd = (sys.argv[1] if len(sys.argv)>1 else "verify").lower()
-raise SystemExit(write_manifest() if cmd=='refresh' else verify_manifest())
-"""
+TEMPLATES = pathlib.Path(__file__).resolve().parent / "templates"
+provenance_v2 = (TEMPLATES / "provenance_v2.py").read_text(encoding="utf-8").replace("__SUBJECT_SHA256__", SUBJECT_SHA256)
 write(BASE/"scripts"/"provenance_v2.py", provenance_v2, 0o755)
 
 triad_verify = """#!/usr/bin/env python3
@@ -168,27 +133,7 @@ raise SystemExit(0 if all(c==0 for c in codes) else 2)
 """
 write(BASE/"scripts"/"triad_verify.py", triad_verify, 0o755)
 
-hologram_emit = f"""#!/usr/bin/env python3
-import os, json, hashlib, datetime, pathlib
-ROOT = pathlib.Path(file).resolve().parents[1]
-MANIFEST = ROOT / "manifests" / "MANIFEST.checksums.json"
-HOLODIR = ROOT / "manifests" / "holograms"; HOLODIR.mkdir(parents=True, exist_ok=True)
-SUBJECT_SHA256 = "{SUBJECT_SHA256}"
-def sha256_path(p):
-h = hashlib.sha256();
-with open(p, "rb") as f:
-for ch in iter(lambda: f.read(65536), b""): h.update(ch)
-return h.hexdigest()
-tag = os.environ.get("GITHUB_REF_NAME","v3-local")
-utc = datetime.datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
-manifest_hash = sha256_path(MANIFEST) if MANIFEST.exists() else None
-prev=None; hs=sorted(HOLODIR.glob("release_*.json"))
-if hs: prev=hashlib.sha256(hs[-1].read_bytes()).hexdigest()
-stellar = hashlib.sha256(f"{SUBJECT_SHA256}{utc}{manifest_hash}".encode()).hexdigest()
-out = HOLODIR / f"release_{tag}.json"
-out.write_text(json.dumps({{"release":tag,"utc":utc,"subject_sha256":SUBJECT_SHA256,"manifest_sha256":manifest_hash,"previous_hologram_sha256":prev,"stellar_vector":stellar,"level":len(hs)+1}}, indent=2), encoding="utf-8")
-print(f"Emitted hologram: {{out}}")
-"""
+hologram_emit = (TEMPLATES / "hologram_emit.py").read_text(encoding="utf-8").replace("__SUBJECT_SHA256__", SUBJECT_SHA256)
 write(BASE/"scripts"/"hologram_emit.py", hologram_emit, 0o755)
 
 -------- Minimal CI
@@ -510,43 +455,8 @@ write(BASE/"cni"/"cni_cli.py", cni_cli, 0o755)
 write(BASE/"cni"/"README.md", "Celestial Neural Interface (local stub): symbolic-to-plan mapping; no network.")
 
 -------- Integrity & governance (reusing v2.x patterns in compact form)
-provenance_v2 = f"""#!/usr/bin/env python3
-import os, json, hashlib, pathlib, sys, datetime
-SUBJECT_SHA256 = "{SUBJECT_SHA256}"
-ROOT = pathlib.Path(file).resolve().parents[1]
-MANIFEST = ROOT / "manifests" / "MANIFEST.checksums.json"
-def sha256_path(p: pathlib.Path) -> str:
-h = hashlib.sha256();
-with open(p, "rb") as f:
-for ch in iter(lambda: f.read(65536), b""): h.update(ch)
-return h.hexdigest()
-def enumerate_files(root: pathlib.Path):
-for p in root.rglob("*"):
-if p.is_file() and ".git" not in p.parts and "dist" not in p.parts: yield p
-def build_manifest():
-items = []
-for p in sorted(enumerate_files(ROOT)):
-rel = p.relative_to(ROOT).as_posix()
-items.append({{"path": rel, "size": p.stat().st_size, "sha256": sha256_path(p)}})
-return {{"subject_sha256": SUBJECT_SHA256, "generated_utc": datetime.datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"), "items": items}}
-def write_manifest():
-MANIFEST.parent.mkdir(parents=True, exist_ok=True)
-data = build_manifest()
-MANIFEST.write_text(json.dumps(data, indent=2), encoding="utf-8")
-print(f"Wrote manifest: {{MANIFEST}}"); return 0
-def verify_manifest():
-if not MANIFEST.exists(): print("Missing manifest"); return 1
-data = json.loads(MANIFEST.read_text(encoding="utf-8"))
-failures = 0
-for item in data.get("items", []):
-p = ROOT / item["path"]
-if not p.exists(): print(f"MISSING: {{item['path']}}"); failures += 1; continue
-if sha256_path(p) != item["sha256"]: print(f"DRIFT: {{item['path']}}"); failures += 1
-print("OK ✓" if failures==0 else f"FAIL ✗ {failures}"); return 0 if failures==0 else 2
-if name == "main":
-cmd = (sys.argv[1] if len(sys.argv)>1 else "verify").lower()
-raise SystemExit(write_manifest() if cmd=='refresh' else verify_manifest())
-"""
+TEMPLATES = pathlib.Path(__file__).resolve().parent / "templates"
+provenance_v2 = (TEMPLATES / "provenance_v2.py").read_text(encoding="utf-8").replace("__SUBJECT_SHA256__", SUBJECT_SHA256)
 write(BASE/"scripts"/"provenance_v2.py", provenance_v2, 0o755)
 
 triad_verify = """#!/usr/bin/env python3
@@ -558,27 +468,7 @@ raise SystemExit(0 if all(c==0 for c in codes) else 2)
 """
 write(BASE/"scripts"/"triad_verify.py", triad_verify, 0o755)
 
-hologram_emit = f"""#!/usr/bin/env python3
-import os, json, hashlib, datetime, pathlib
-ROOT = pathlib.Path(file).resolve().parents[1]
-MANIFEST = ROOT / "manifests" / "MANIFEST.checksums.json"
-HOLODIR = ROOT / "manifests" / "holograms"; HOLODIR.mkdir(parents=True, exist_ok=True)
-SUBJECT_SHA256 = "{SUBJECT_SHA256}"
-def sha256_path(p):
-h = hashlib.sha256();
-with open(p, "rb") as f:
-for ch in iter(lambda: f.read(65536), b""): h.update(ch)
-return h.hexdigest()
-tag = os.environ.get("GITHUB_REF_NAME","v3-local")
-utc = datetime.datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
-manifest_hash = sha256_path(MANIFEST) if MANIFEST.exists() else None
-prev=None; hs=sorted(HOLODIR.glob("release_*.json"))
-if hs: prev=hashlib.sha256(hs[-1].read_bytes()).hexdigest()
-stellar = hashlib.sha256(f"{SUBJECT_SHA256}{utc}{manifest_hash}".encode()).hexdigest()
-out = HOLODIR / f"release_{tag}.json"
-out.write_text(json.dumps({{"release":tag,"utc":utc,"subject_sha256":SUBJECT_SHA256,"manifest_sha256":manifest_hash,"previous_hologram_sha256":prev,"stellar_vector":stellar,"level":len(hs)+1}}, indent=2), encoding="utf-8")
-print(f"Emitted hologram: {{out}}")
-"""
+hologram_emit = (TEMPLATES / "hologram_emit.py").read_text(encoding="utf-8").replace("__SUBJECT_SHA256__", SUBJECT_SHA256)
 write(BASE/"scripts"/"hologram_emit.py", hologram_emit, 0o755)
 
 -------- Minimal CI
@@ -70,69 +70,8 @@ write(BASE / "glyphs" / "tsg.schema.json", json.dumps(tsg, indent=2))
 write(BASE / "glyphs" / "tgs.schema.json", json.dumps(tgs, indent=2))
 write(BASE / "constraints" / "unified_constraints.json", json.dumps(constraints, indent=2))
 ---------- Scripts ----------
-provenance_v2 = f"""#!/usr/bin/env python3
-import os, json, hashlib, pathlib, sys, datetime
-SUBJECT_SHA256 = "{SUBJECT_SHA256}"
-ROOT = pathlib.Path(file).resolve().parents[1]
-MANIFEST = ROOT / "manifests" / "MANIFEST.checksums.json"
-HISTORY = ROOT / "manifests" / "HISTORY.log"
-def sha256_path(p: pathlib.Path) -> str:
-h = hashlib.sha256()
-with open(p, "rb") as f:
-for chunk in iter(lambda: f.read(65536), b""):
-h.update(chunk)
-return h.hexdigest()
-def enumerate_files(root: pathlib.Path):
-for p in root.rglob("*"):
-if p.is_file() and ".git" not in p.parts and "dist" not in p.parts:
-yield p
-def build_manifest():
-items = []
-for p in sorted(enumerate_files(ROOT)):
-rel = p.relative_to(ROOT).as_posix()
-items.append({{"path": rel, "size": p.stat().st_size, "sha256": sha256_path(p)}})
-return {{
-"subject_sha256": SUBJECT_SHA256,
-"generated_utc": datetime.datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
-"items": items
-}}
-def write_manifest():
-MANIFEST.parent.mkdir(parents=True, exist_ok=True)
-data = build_manifest()
-before = MANIFEST.read_text(encoding="utf-8") if MANIFEST.exists() else ""
-MANIFEST.write_text(json.dumps(data, indent=2), encoding="utf-8")
-after = MANIFEST.read_text(encoding="utf-8")
-if before != after:
-HISTORY.parent.mkdir(parents=True, exist_ok=True)
-HISTORY.write_text((HISTORY.read_text(encoding="utf-8") if HISTORY.exists() else "") + f"[reseal] {{data['generated_utc']}}\n", encoding="utf-8")
-print(f"Wrote manifest: {{MANIFEST}}")
-return 0
-def verify_manifest():
-if not MANIFEST.exists():
-print("Manifest missing. Run 'refresh' first.", file=sys.stderr); return 1
-data = json.loads(MANIFEST.read_text(encoding="utf-8"))
-failures, drifts = 0, []
-for item in data.get("items", []):
-p = ROOT / item["path"]
-if not p.exists():
-print(f"MISSING: {{item['path']}}"); failures += 1; continue
-actual = sha256_path(p)
-if actual != item["sha256"]:
-drifts.append((item["path"], item["sha256"], actual)); failures += 1
-if drifts:
-print("DRIFT DETECTED:")
-for path, exp, act in drifts:
-print(f" - {{path}}\n   expected: {{exp}}\n   actual:   {{act}}\n   suggestion: reseal if intentional -> python3 scripts/provenance_v2.py refresh")
-print(f"Subject: {{data.get('subject_sha256')}} | Generated: {{data.get('generated_utc')}}")
-print("OK ✓ All files match manifest." if failures==0 else f"FAIL ✗ Mismatches: {{failures}}")
-return 0 if failures==0 else 2
-if name == "main":
-cmd = (sys.argv[1] if len(sys.argv)>1 else "verify").lower()
-if cmd == "refresh": raise SystemExit(write_manifest())
-elif cmd == "verify": raise SystemExit(verify_manifest())
-else:
-print("Usage: provenance_v2.py [verify|refresh]"); raise SystemExit(64)
-"""
+TEMPLATES = pathlib.Path(__file__).resolve().parent / "templates"
+provenance_v2 = (TEMPLATES / "provenance_v2.py").read_text(encoding="utf-8").replace("__SUBJECT_SHA256__", SUBJECT_SHA256)
 write(BASE / "scripts" / "provenance_v2.py", provenance_v2); os.chmod(BASE / "scripts" / "provenance_v2.py", 0o755)
 curiosity_report = """#!/usr/bin/env python3
 Summarize recent churn and integrity events (lightweight, repo-local).
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+# Emit a release hologram chained to the previous one. The manifest is identified by the
+# merkle root recorded in MANIFEST.merkle.json (see provenance_v2.py), falling back to a
+# hash of the flat MANIFEST.checksums.json for trees resealed before the merkle format.
+import os, json, hashlib, datetime, pathlib
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+MANIFEST = ROOT / "manifests" / "MANIFEST.checksums.json"
+MERKLE = ROOT / "manifests" / "MANIFEST.merkle.json"
+HOLODIR = ROOT / "manifests" / "holograms"; HOLODIR.mkdir(parents=True, exist_ok=True)
+SUBJECT_SHA256 = "__SUBJECT_SHA256__"
+def sha256_path(p):
+    h = hashlib.sha256()
+    with open(p, "rb") as f:
+        for ch in iter(lambda: f.read(1 << 20), b""): h.update(ch)
+    return h.hexdigest()
+tag = os.environ.get("GITHUB_REF_NAME","v3-local")
+utc = datetime.datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+merkle_root = json.loads(MERKLE.read_text(encoding="utf-8")).get("root") if MERKLE.exists() else None
+manifest_hash = sha256_path(MANIFEST) if MANIFEST.exists() else None
+prev=None; hs=sorted(HOLODIR.glob("release_*.json"))
+if hs: prev=hashlib.sha256(hs[-1].read_bytes()).hexdigest()
+stellar = hashlib.sha256(f"{SUBJECT_SHA256}{utc}{merkle_root or manifest_hash}".encode()).hexdigest()
+out = HOLODIR / f"release_{tag}.json"
+out.write_text(json.dumps({"release":tag,"utc":utc,"subject_sha256":SUBJECT_SHA256,"manifest_merkle_root":merkle_root,"manifest_sha256":manifest_hash,"previous_hologram_sha256":prev,"stellar_vector":stellar,"level":len(hs)+1}, indent=2), encoding="utf-8")
+print(f"Emitted hologram: {out}")
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+# Adaptive Provenance v2 — manifest reseal/verify with an incremental hash cache.
+#   provenance_v2.py refresh [--full] [--jobs N]
+#   provenance_v2.py verify [--changed-only] [--subtree DIR] [--jobs N]
+#   provenance_v2.py prove PATH | diff OLD.merkle.json NEW.merkle.json | export-flat [MERKLE]
+# The cache (manifests/.hashcache.json) maps path -> (size, mtime_ns, inode, sha256).
+# refresh only re-hashes files whose stat changed; `verify --changed-only` trusts the
+# cache for unchanged files, so an untouched tree verifies with stat() calls alone.
+# refresh also writes MANIFEST.merkle.json: a directory tree whose nodes carry a digest
+# of their children (a binary Merkle tree over each directory's sorted entries), so one
+# subtree can be verified alone, a file has an O(log n) inclusion proof against the
+# root, and two manifests diff by descending only into subtrees whose digests differ.
+# MANIFEST.checksums.json stays the flat export of the same tree for older tooling.
+import os, json, hashlib, pathlib, sys, datetime, argparse, time
+from concurrent.futures import ThreadPoolExecutor
+
+SUBJECT_SHA256 = "__SUBJECT_SHA256__"
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+MANIFEST = ROOT / "manifests" / "MANIFEST.checksums.json"
+MERKLE = ROOT / "manifests" / "MANIFEST.merkle.json"
+HISTORY = ROOT / "manifests" / "HISTORY.log"
+CACHE = ROOT / "manifests" / ".hashcache.json"
+OUTPUTS = {MANIFEST, MERKLE, HISTORY, CACHE}  # written by this script, never part of the manifest
+CHUNK = 1 << 20
+RACY_NS = 2_000_000_000  # files modified this close to a hash run are not cached (mtime granularity)
+
+def sha256_path(p) -> str:
+    h = hashlib.sha256()
+    with open(p, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def enumerate_files(root: pathlib.Path):
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for e in it:
+                if e.name in (".git", "dist"):
+                    continue
+                if e.is_dir(follow_symlinks=False):
+                    stack.append(e.path)
+                elif e.is_file() and pathlib.Path(e.path) not in OUTPUTS:
+                    yield pathlib.Path(e.path)
+
+def stat_key(st):
+    return [st.st_size, st.st_mtime_ns, st.st_ino]
+
+def load_cache():
+    try:
+        return json.loads(CACHE.read_text(encoding="utf-8")).get("entries", {})
+    except (OSError, ValueError):
+        return {}
+
+def save_cache(entries):
+    CACHE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = CACHE.with_suffix(".tmp")
+    tmp.write_text(json.dumps({"version": 1, "entries": entries}, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp, CACHE)
+
+def hash_many(paths, jobs):
+    # hashlib releases the GIL while digesting large buffers, so threads spread across cores
+    if len(paths) < 2 or jobs == 1:
+        return [sha256_path(p) for p in paths]
+    with ThreadPoolExecutor(max_workers=jobs) as ex:
+        return list(ex.map(sha256_path, paths))
+
+def resolve(stats, cache, jobs, use_cache=True):
+    """Return ({rel: sha256}, new_cache) for stats {rel: (path, stat)}; only cache misses are hashed."""
+    started = time.time_ns()
+    digests, misses, fresh = {}, [], {}
+    for rel, (p, st) in stats.items():
+        key, hit = stat_key(st), cache.get(rel)
+        if use_cache and hit and hit[:3] == key:
+            digests[rel] = hit[3]; fresh[rel] = hit
+        else:
+            misses.append(rel)
+    for rel, digest in zip(misses, hash_many([stats[r][0] for r in misses], jobs)):
+        digests[rel] = digest
+        st = stats[rel][1]
+        if st.st_mtime_ns < started - RACY_NS:
+            fresh[rel] = stat_key(st) + [digest]
+    return digests, fresh
+
+# ---------- Merkle manifest ----------
+def _h(*parts: bytes) -> bytes:
+    return hashlib.sha256(b"".join(parts)).digest()
+
+def file_digest(sha256: str, size: int) -> str:
+    return _h(b"F", str(size).encode(), b"\0", bytes.fromhex(sha256)).hex()
+
+def _entry(name: str, digest: str) -> bytes:
+    return _h(b"\x00", name.encode("utf-8"), b"\0", bytes.fromhex(digest))
+
+def _levels(leaves):
+    # leaves -> every level of the binary tree, bottom first; an odd last node is promoted
+    levels = [leaves]
+    while len(levels[-1]) > 1:
+        cur = levels[-1]
+        levels.append([_h(b"\x01", cur[i], cur[i + 1]) if i + 1 < len(cur) else cur[i] for i in range(0, len(cur), 2)])
+    return levels
+
+def dir_digest(children: dict) -> str:
+    names = sorted(children)
+    if not names:
+        return hashlib.sha256(b"").hexdigest()
+    return _levels([_entry(n, children[n]["digest"]) for n in names])[-1][0].hex()
+
+def merkle_tree(items):
+    """Build the nested tree from flat manifest items ({path, size, sha256})."""
+    root = {"type": "dir", "children": {}}
+    for item in items:
+        *dirs, name = item["path"].split("/")
+        node = root
+        for d in dirs:
+            node = node["children"].setdefault(d, {"type": "dir", "children": {}})
+        node["children"][name] = {"type": "file", "size": item["size"], "sha256": item["sha256"],
+                                  "digest": file_digest(item["sha256"], item["size"])}
+    def seal(node):
+        for child in node["children"].values():
+            if child["type"] == "dir":
+                seal(child)
+        node["digest"] = dir_digest(node["children"])
+    seal(root)
+    return root
+
+def recompute(node) -> str:
+    if node["type"] == "file":
+        return file_digest(node["sha256"], node["size"])
+    return dir_digest({n: {"digest": recompute(c)} for n, c in node["children"].items()})
+
+def flatten(node, prefix=""):
+    """Flat items (the MANIFEST.checksums.json format) under a tree node, sorted by path."""
+    if node["type"] == "file":
+        return [{"path": prefix, "size": node["size"], "sha256": node["sha256"]}]
+    out = []
+    for name in sorted(node["children"]):
+        out.extend(flatten(node["children"][name], f"{prefix}/{name}" if prefix else name))
+    return out
+
+def merkle_doc(data):
+    tree = merkle_tree(data["items"])
+    return {"format": "merkle-v1", "subject_sha256": data["subject_sha256"],
+            "generated_utc": data["generated_utc"], "root": tree["digest"], "tree": tree}
+
+def export_flat(doc):
+    return {"subject_sha256": doc["subject_sha256"], "generated_utc": doc["generated_utc"], "items": flatten(doc["tree"])}
+
+def find(tree, path):
+    node = tree
+    for part in [p for p in path.strip("/").split("/") if p]:
+        if node["type"] != "dir" or part not in node["children"]:
+            return None
+        node = node["children"][part]
+    return node
+
+def prove(tree, path):
+    """Inclusion proof for one file: per enclosing directory (innermost first), the sibling path."""
+    parts = path.strip("/").split("/")
+    chain, node = [], tree
+    for part in parts:
+        if node["type"] != "dir" or part not in node["children"]:
+            raise KeyError(path)
+        chain.append((node, part)); node = node["children"][part]
+    if node["type"] != "file":
+        raise KeyError(path)
+    steps = []
+    for parent, name in reversed(chain):
+        names = sorted(parent["children"])
+        levels, i, sib = _levels([_entry(n, parent["children"][n]["digest"]) for n in names]), names.index(name), []
+        for level in levels[:-1]:
+            j = i ^ 1
+            if j < len(level):
+                sib.append(["L" if j < i else "R", level[j].hex()])
+            i //= 2
+        steps.append({"name": name, "siblings": sib})
+    return {"path": "/".join(parts), "size": node["size"], "sha256": node["sha256"], "root": tree["digest"], "steps": steps}
+
+def check_proof(proof, root=None) -> bool:
+    digest = file_digest(proof["sha256"], proof["size"])
+    for step in proof["steps"]:
+        acc = _entry(step["name"], digest)
+        for side, sib in step["siblings"]:
+            acc = _h(b"\x01", bytes.fromhex(sib), acc) if side == "L" else _h(b"\x01", acc, bytes.fromhex(sib))
+        digest = acc.hex()
+    return digest == (root or proof["root"])
+
+def diff_trees(old, new, prefix=""):
+    """Yield (change, path) pairs, skipping every subtree whose digest is unchanged."""
+    if old["digest"] == new["digest"]:
+        return
+    if old["type"] != "dir" or new["type"] != "dir":
+        yield ("changed", prefix); return
+    oc, nc = old["children"], new["children"]
+    for name in sorted(oc.keys() | nc.keys()):
+        path = f"{prefix}/{name}" if prefix else name
+        if name not in nc:
+            yield ("removed", path)
+        elif name not in oc:
+            yield ("added", path)
+        else:
+            yield from diff_trees(oc[name], nc[name], path)
+
+def load_merkle(path=MERKLE):
+    doc = json.loads(pathlib.Path(path).read_text(encoding="utf-8"))
+    if doc.get("format") != "merkle-v1":
+        raise ValueError(f"{path}: not a merkle-v1 manifest")
+    return doc
+
+def build_manifest(jobs=os.cpu_count() or 1, use_cache=True):
+    stats = {}
+    for p in enumerate_files(ROOT):
+        stats[p.relative_to(ROOT).as_posix()] = (p, p.stat())
+    digests, fresh = resolve(stats, load_cache(), jobs, use_cache)
+    save_cache(fresh)
+    items = [{"path": rel, "size": stats[rel][1].st_size, "sha256": digests[rel]} for rel in sorted(stats)]
+    return {
+        "subject_sha256": SUBJECT_SHA256,
+        "generated_utc": datetime.datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "items": items
+    }
+
+def write_manifest(jobs=os.cpu_count() or 1, use_cache=True):
+    MANIFEST.parent.mkdir(parents=True, exist_ok=True)
+    data = build_manifest(jobs, use_cache)
+    before = MANIFEST.read_text(encoding="utf-8") if MANIFEST.exists() else ""
+    after = json.dumps(data, indent=2)
+    MANIFEST.write_text(after, encoding="utf-8")
+    doc = merkle_doc(data)
+    MERKLE.write_text(json.dumps(doc, separators=(",", ":")), encoding="utf-8")
+    if before != after:
+        HISTORY.parent.mkdir(parents=True, exist_ok=True)
+        with open(HISTORY, "a", encoding="utf-8") as f:
+            f.write(f"[reseal] {data['generated_utc']}\n")
+    print(f"Wrote manifest: {MANIFEST} (merkle root {doc['root']})")
+    return 0
+
+def verify_manifest(jobs=os.cpu_count() or 1, changed_only=False, subtree=None):
+    if not (MERKLE if subtree else MANIFEST).exists():
+        print("Manifest missing. Run 'refresh' first.", file=sys.stderr); return 1
+    if subtree:
+        doc, prefix = load_merkle(), subtree.strip("/")
+        node, chain = doc["tree"], [doc["tree"]]
+        for part in [p for p in prefix.split("/") if p]:
+            node = node["children"].get(part) if node["type"] == "dir" else None
+            if node is None:
+                print(f"Not in manifest: {subtree}", file=sys.stderr); return 1
+            chain.append(node)
+        # the subtree must be internally consistent and its digest must chain up to the recorded root
+        if chain[0]["digest"] != doc["root"] or recompute(node) != node["digest"] or \
+                any(dir_digest(d["children"]) != d["digest"] for d in chain[:-1]):
+            print(f"CORRUPT MANIFEST: digest chain broken above {prefix or '/'}", file=sys.stderr); return 2
+        data = {"subject_sha256": doc["subject_sha256"], "generated_utc": doc["generated_utc"], "items": flatten(node, prefix)}
+        if node["type"] == "dir":
+            known = {i["path"] for i in data["items"]}
+            for p in enumerate_files(ROOT / prefix if prefix else ROOT):
+                rel = p.relative_to(ROOT).as_posix()
+                if rel not in known:
+                    print(f"UNTRACKED: {rel}")
+    else:
+        data = json.loads(MANIFEST.read_text(encoding="utf-8"))
+    failures, drifts, stats, expected = 0, [], {}, {}
+    for item in data.get("items", []):
+        p = ROOT / item["path"]
+        try:
+            st = p.stat()
+        except FileNotFoundError:
+            print(f"MISSING: {item['path']}"); failures += 1; continue
+        if st.st_size != item["size"]:
+            drifts.append((item["path"], item["sha256"], f"<size {st.st_size} != {item['size']}>")); failures += 1; continue
+        stats[item["path"]] = (p, st); expected[item["path"]] = item["sha256"]
+    cache = load_cache()
+    digests, fresh = resolve(stats, cache, jobs, use_cache=changed_only)
+    for rel, exp in expected.items():
+        if digests[rel] != exp:
+            drifts.append((rel, exp, digests[rel])); failures += 1
+    merged = {**cache, **fresh}
+    if merged != cache:
+        save_cache(merged)
+    if drifts:
+        print("DRIFT DETECTED:")
+        for path, exp, act in drifts:
+            print(f" - {path}\n   expected: {exp}\n   actual:   {act}\n   suggestion: reseal if intentional -> python3 scripts/provenance_v2.py refresh")
+    print(f"Subject: {data.get('subject_sha256')} | Generated: {data.get('generated_utc')}")
+    print("OK ✓ All files match manifest." if failures==0 else f"FAIL ✗ Mismatches: {failures}")
+    return 0 if failures==0 else 2
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="provenance_v2.py")
+    ap.add_argument("cmd", nargs="?", default="verify", type=str.lower, choices=("verify", "refresh", "prove", "diff", "export-flat"))
+    ap.add_argument("args", nargs="*")
+    ap.add_argument("--changed-only", action="store_true", help="verify: trust the stat cache for unchanged files")
+    ap.add_argument("--subtree", help="verify: only the files under this directory (uses the merkle manifest)")
+    ap.add_argument("--full", action="store_true", help="refresh: ignore the cache and re-hash everything")
+    ap.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    args = ap.parse_args(argv)
+    if args.cmd == "refresh": return write_manifest(args.jobs, use_cache=not args.full)
+    if args.cmd == "verify": return verify_manifest(args.jobs, changed_only=args.changed_only, subtree=args.subtree)
+    if args.cmd == "prove":
+        if len(args.args) != 1: ap.error("prove PATH")
+        try:
+            proof = prove(load_merkle()["tree"], args.args[0])
+        except KeyError:
+            print(f"Not in manifest: {args.args[0]}", file=sys.stderr); return 1
+        print(json.dumps(proof, indent=2)); return 0 if check_proof(proof) else 2
+    if args.cmd == "diff":
+        if len(args.args) != 2: ap.error("diff OLD NEW")
+        changes = list(diff_trees(load_merkle(args.args[0])["tree"], load_merkle(args.args[1])["tree"]))
+        for change, path in changes:
+            print(f"{change.upper():8} {path}")
+        return 0 if not changes else 3
+    doc = load_merkle(args.args[0] if args.args else MERKLE)
+    print(json.dumps(export_flat(doc), indent=2)); return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+Attestation Chain Store
+Part of the Codex Continuum Build System
+EUCELA Tri-License © 2025 Caleb Fedor Byker (Konev)
+
+chain/attestations.jsonl stays the source of truth: one JSON attestation per
+line, append-only. Every line appended through this store carries
+"prev_sha256", the SHA-256 of the previous raw line, so the file is a hash
+chain (older, unlinked lines are still hashed and linked to).
+
+The chain tail (offset, length and SHA-256 of the last line, line count,
+bytes covered) is persisted in chain/attestations.tail.json, so opening the
+store, head(), len() and append() read a few hundred bytes whatever the chain
+length. latest() on the newest attestation is answered from the tail too.
+
+The secondary index (omega_id, artifact sha256, timestamp) is an SQLite
+database, chain/attestations.index.sqlite, that records how many chain bytes
+it covers. Opening it checks the last indexed line against the chain and
+indexes only the lines appended since (in one transaction); a lookup is then
+a B-tree probe plus one seek per result, whatever the chain length. Nothing
+is written to it unless new lines were indexed.
+
+    python tools/attestation_store.py get OMEGA_ID
+    python tools/attestation_store.py by-sha SHA256
+    python tools/attestation_store.py range [START] [END]
+    python tools/attestation_store.py head | verify | compact
+    python tools/attestation_store.py append '{"event": ...}'
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX
+    fcntl = None
+
+DEFAULT_CHAIN = "chain/attestations.jsonl"
+INDEX_VERSION = 2
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value);
+CREATE TABLE IF NOT EXISTS entries (seq INTEGER PRIMARY KEY, offset INTEGER, length INTEGER, digest TEXT);
+CREATE TABLE IF NOT EXISTS by_omega (omega_id TEXT, seq INTEGER);
+CREATE TABLE IF NOT EXISTS by_sha (sha TEXT, seq INTEGER);
+CREATE TABLE IF NOT EXISTS by_time (ts TEXT, seq INTEGER);
+CREATE INDEX IF NOT EXISTS by_omega_key ON by_omega (omega_id, seq);
+CREATE INDEX IF NOT EXISTS by_sha_key ON by_sha (sha, seq);
+CREATE INDEX IF NOT EXISTS by_time_key ON by_time (ts, seq);
+"""
+TAIL_VERSION = 1
+GENESIS = "0" * 64
+
+def _line_hash(raw):
+    return hashlib.sha256(raw).hexdigest()
+
+def _artifact_hashes(record):
+    artifacts = record.get("artifacts")
+    if not isinstance(artifacts, dict):
+        return []
+    return [a["sha256"] for a in artifacts.values() if isinstance(a, dict) and isinstance(a.get("sha256"), str)]
+
+class AttestationStore:
+    """Hash-linked attestation chain with a persistent secondary index"""
+
+    def __init__(self, path=DEFAULT_CHAIN, index_path=None):
+        self.path = path
+        self.index_path = index_path or os.path.splitext(path)[0] + ".index.sqlite"
+        self.tail_path = os.path.splitext(path)[0] + ".tail.json"
+        self._db = None   # secondary index not opened until a query needs it
+        self._checked = False   # index validated against the chain since it was opened
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if not self._load_tail():
+            self._tail, self._count, self._tail_bytes = None, 0, 0
+        self._tail_catch_up()
+
+    @staticmethod
+    def sidecars(path=DEFAULT_CHAIN):
+        """Files the store maintains next to the chain (index, tail, temp files; the JSON index is pre-SQLite)"""
+        base = os.path.splitext(path)[0]
+        return {base + ".index.sqlite", base + ".index.sqlite-journal", base + ".index.json", base + ".index.json.tmp",
+                base + ".tail.json", base + ".tail.json.tmp"}
+
+    # ---------- tail ----------
+    def _load_tail(self):
+        try:
+            with open(self.tail_path, "r") as f:
+                tail = json.load(f)
+            if tail.get("version") != TAIL_VERSION or os.path.getsize(self.path) < tail["chain_bytes"]:
+                return False
+            if tail["last"]:
+                offset, length, digest = tail["last"]
+                with open(self.path, "rb") as f:
+                    f.seek(offset)
+                    if _line_hash(f.read(length)) != digest:
+                        return False  # chain was rewritten underneath the tail
+        except (OSError, ValueError, KeyError):
+            return False
+        self._tail, self._count, self._tail_bytes = tail["last"], tail["entries"], tail["chain_bytes"]
+        return True
+
+    def _tail_catch_up(self):
+        """Advance the tail over lines appended by other writers (reads only the new bytes)"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self._tail_bytes)
+            offset = self._tail_bytes
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # partial write in progress; pick it up next time
+                raw = line.rstrip(b"\r\n")
+                if raw.strip():
+                    self._tail = [offset, len(raw), _line_hash(raw)]
+                    self._count += 1
+                offset += len(line)
+            self._tail_bytes = offset
+
+    def _save_tail(self):
+        tmp = self.tail_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"version": TAIL_VERSION, "chain_bytes": self._tail_bytes, "entries": self._count,
+                       "last": self._tail}, f, separators=(",", ":"))
+        os.replace(tmp, self.tail_path)
+
+    # ---------- index ----------
+    def _ensure_index(self):
+        """Open the secondary index and index any lines appended since it was last brought up to date"""
+        if self._db is None:
+            self._db = sqlite3.connect(self.index_path, isolation_level=None)
+            self._db.executescript(INDEX_SCHEMA)
+        self._catch_up()
+        return self._db
+
+    def _meta(self, key, default=None):
+        row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def _index_valid(self, size):
+        """True when the index describes a prefix of the current chain (checks only the last indexed line)"""
+        if self._meta("version") != INDEX_VERSION or size < self._meta("chain_bytes", 0):
+            return False
+        last = self._db.execute("SELECT offset, length, digest FROM entries ORDER BY seq DESC LIMIT 1").fetchone()
+        if last:
+            with open(self.path, "rb") as f:
+                f.seek(last[0])
+                if _line_hash(f.read(last[1])) != last[2]:
+                    return False  # chain was rewritten underneath the index
+        return True
+
+    def _catch_up(self):
+        """Index lines appended since the index was last updated (by us or any other writer)"""
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            size = 0
+        if self._checked and self._meta("chain_bytes", 0) == size:
+            return  # read-only fast path: nothing new, nothing written
+        db = self._db
+        db.execute("BEGIN IMMEDIATE")  # one indexer at a time; re-check under the lock
+        try:
+            rebuilt = not self._index_valid(size)
+            if rebuilt:
+                for table in ("meta", "entries", "by_omega", "by_sha", "by_time"):
+                    db.execute(f"DELETE FROM {table}")
+            start = self._meta("chain_bytes", 0)
+            seq = db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            offset = start
+            if size > start:
+                with open(self.path, "rb") as f:
+                    f.seek(start)
+                    for line in f:
+                        if not line.endswith(b"\n"):
+                            break  # partial write in progress; pick it up next time
+                        raw = line.rstrip(b"\r\n")
+                        if raw.strip():
+                            self._index(seq, offset, raw)
+                            seq += 1
+                        offset += len(line)
+            if not rebuilt and offset == start:
+                db.execute("ROLLBACK")  # valid and nothing complete is new: leave the index untouched
+                self._checked = True
+                return
+            db.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                           [("version", INDEX_VERSION), ("chain_bytes", offset)])
+            db.execute("COMMIT")
+            self._checked = True
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        if offset >= self._tail_bytes:
+            last = self._db.execute("SELECT offset, length, digest FROM entries ORDER BY seq DESC LIMIT 1").fetchone()
+            self._tail, self._count, self._tail_bytes = list(last) if last else None, seq, offset
+            self._save_tail()
+
+    def _index(self, seq, offset, raw):
+        try:
+            record = json.loads(raw)
+        except ValueError:
+            record = {}
+        if not isinstance(record, dict):
+            record = {}
+        db = self._db
+        db.execute("INSERT INTO entries VALUES (?, ?, ?, ?)", (seq, offset, len(raw), _line_hash(raw)))
+        if record.get("omega_id"):
+            db.execute("INSERT INTO by_omega VALUES (?, ?)", (str(record["omega_id"]), seq))
+        db.executemany("INSERT INTO by_sha VALUES (?, ?)", [(sha, seq) for sha in _artifact_hashes(record)])
+        if isinstance(record.get("timestamp"), str):
+            db.execute("INSERT INTO by_time VALUES (?, ?)", (record["timestamp"], seq))
+
+    def compact(self):
+        """Bring the index and tail fully up to date; returns the head hash"""
+        self._ensure_index()
+        return self.head()
+
+    # ---------- writes ----------
+    def append(self, record):
+        """Append one attestation linked to the current head; returns the stored record"""
+        with open(self.path, "ab") as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                self._tail_catch_up()  # another writer may have appended since we opened
+                linked = dict(record)
+                linked["prev_sha256"] = self.head()
+                raw = json.dumps(linked).encode("utf-8")
+                f.seek(0, os.SEEK_END)
+                offset = f.tell()
+                f.write(raw + b"\n")
+                f.flush()
+                os.fsync(f.fileno())
+                self._tail, self._tail_bytes = [offset, len(raw), _line_hash(raw)], offset + len(raw) + 1
+                self._count += 1
+                self._save_tail()
+            finally:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+        if self._db is not None:
+            self._catch_up()
+        return linked
+
+    # ---------- reads ----------
+    def __len__(self):
+        return self._count
+
+    def head(self):
+        """SHA-256 of the newest line, or the genesis hash for an empty chain"""
+        return self._tail[2] if self._tail else GENESIS
+
+    def _read(self, sql, args=()):
+        """Records for the (offset, length) rows a query over the index returns"""
+        out = []
+        with open(self.path, "rb") as f:
+            for offset, length in self._ensure_index().execute(sql, args):
+                f.seek(offset)
+                out.append(json.loads(f.read(length)))
+        return out
+
+    def get(self, omega_id):
+        """All attestations for an omega_id, oldest first"""
+        return self._read("SELECT offset, length FROM by_omega JOIN entries USING (seq) WHERE omega_id = ? ORDER BY seq",
+                          (omega_id,))
+
+    def latest(self, omega_id):
+        if self._tail:
+            # the newest line usually is the one asked for: one seek, no index needed
+            with open(self.path, "rb") as f:
+                f.seek(self._tail[0])
+                try:
+                    record = json.loads(f.read(self._tail[1]))
+                except ValueError:
+                    record = {}
+            if isinstance(record, dict) and record.get("omega_id") == omega_id:
+                return record
+        found = self._read("SELECT offset, length FROM by_omega JOIN entries USING (seq) WHERE omega_id = ? "
+                           "ORDER BY seq DESC LIMIT 1", (omega_id,))
+        return found[0] if found else None
+
+    def by_artifact(self, sha256):
+        """All attestations that list an artifact with this SHA-256"""
+        return self._read("SELECT offset, length FROM by_sha JOIN entries USING (seq) WHERE sha = ? ORDER BY seq",
+                          (sha256,))
+
+    def range(self, start=None, end=None, limit=None):
+        """Attestations with start <= timestamp < end (ISO-8601 strings), in time order"""
+        where, args = [], []
+        if start is not None:
+            where.append("ts >= ?"); args.append(start)
+        if end is not None:
+            where.append("ts < ?"); args.append(end)
+        sql = "SELECT offset, length FROM by_time JOIN entries USING (seq)"
+        sql += (" WHERE " + " AND ".join(where) if where else "") + " ORDER BY ts, seq"
+        if limit is not None:
+            sql += " LIMIT ?"; args.append(limit)
+        return self._read(sql, args)
+
+    def verify(self):
+        """Walk the chain and check every prev_sha256 link; returns a list of problems"""
+        rows = self._ensure_index().execute("SELECT seq, offset, length, digest FROM entries ORDER BY seq")
+        problems, prev = [], GENESIS
+        with open(self.path, "rb") as f:
+            for seq, offset, length, digest in rows:
+                f.seek(offset)
+                raw = f.read(length)
+                if _line_hash(raw) != digest:
+                    problems.append(f"entry {seq}: content does not match index")
+                try:
+                    record = json.loads(raw)
+                except ValueError:
+                    record = {}
+                    problems.append(f"entry {seq}: not valid JSON")
+                if "prev_sha256" in record and record["prev_sha256"] != prev:
+                    problems.append(f"entry {seq}: broken link (prev_sha256 {record['prev_sha256'][:16]}..., expected {prev[:16]}...)")
+                prev = _line_hash(raw)
+        return problems
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db, self._checked = None, False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query and maintain the attestation chain")
+    parser.add_argument("--chain", default=DEFAULT_CHAIN)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("get").add_argument("omega_id")
+    sub.add_parser("by-sha").add_argument("sha256")
+    rng = sub.add_parser("range")
+    rng.add_argument("start", nargs="?")
+    rng.add_argument("end", nargs="?")
+    rng.add_argument("--limit", type=int)
+    sub.add_parser("head")
+    sub.add_parser("verify")
+    sub.add_parser("compact")
+    sub.add_parser("append").add_argument("record", help="attestation JSON object")
+    args = parser.parse_args(argv)
+
+    with AttestationStore(args.chain) as store:
+        if args.cmd == "get":
+            results = store.get(args.omega_id)
+        elif args.cmd == "by-sha":
+            results = store.by_artifact(args.sha256)
+        elif args.cmd == "range":
+            results = store.range(args.start, args.end, args.limit)
+        elif args.cmd == "head":
+            print(json.dumps({"head": store.head(), "entries": len(store)}))
+            return 0
+        elif args.cmd == "verify":
+            problems = store.verify()
+            for problem in problems:
+                print(f"❌ {problem}")
+            print(f"✓ Chain intact ({len(store)} entries)" if not problems else f"❌ {len(problems)} problem(s)")
+            return 0 if not problems else 1
+        elif args.cmd == "compact":
+            print(f"✓ Index up to date ({len(store)} entries, head {store.compact()[:16]}...)")
+            return 0
+        else:
+            print(json.dumps(store.append(json.loads(args.record))))
+            return 0
+    for record in results:
+        print(json.dumps(record))
+    return 0 if results else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,100 +3,218 @@
 Monetization Verification Tool
 Part of the Codex Continuum Build System
 EUCELA Tri-License © 2025 Caleb Fedor Byker (Konev)
+
+Usable as a script (one-shot or --watch) or as a library:
+
+    from monetization_verify import run_verification
+    results = run_verification(root=".")
 """
 
+import argparse
 import json
+import mmap
 import os
 import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from attestation_store import AttestationStore
+
+REQUIRED_FILES = [
+    "OMEGA_LOCK.json",
+    "codex_omega_bundle.zip",
+    "codex_capsule.txt",
+    "chain/attestations.jsonl"
+]
+
+CACHE_FILE = "artifacts/.verify_cache.json"
+CHUNK_SIZE = 1024 * 1024
+MMAP_THRESHOLD = 8 * 1024 * 1024
+RACY_NS = 2_000_000_000  # files modified this recently are re-hashed next time (mtime granularity)
 
 def compute_sha256(filepath):
-    """Compute SHA-256 hash of a file"""
+    """Compute SHA-256 hash of a file (mmap for large files, 1 MiB reads otherwise)"""
     sha256_hash = hashlib.sha256()
     with open(filepath, "rb") as f:
-        for byte_block in iter(lambda: f.read(4096), b""):
-            sha256_hash.update(byte_block)
+        size = os.fstat(f.fileno()).st_size
+        if size >= MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                sha256_hash.update(mm)
+        else:
+            for byte_block in iter(lambda: f.read(CHUNK_SIZE), b""):
+                sha256_hash.update(byte_block)
     return sha256_hash.hexdigest()
 
-def verify_artifacts():
-    """Verify integrity of generated artifacts"""
-    
-    print("🔐 Verifying Artifact Integrity...")
-    
-    required_files = [
-        "OMEGA_LOCK.json",
-        "codex_omega_bundle.zip",
-        "codex_capsule.txt",
-        "chain/attestations.jsonl"
-    ]
-    
+def _stat_key(st):
+    return [st.st_size, st.st_mtime_ns, st.st_ino]
+
+def load_stat_cache(root="."):
+    """Load the path -> [size, mtime_ns, inode, sha256] cache"""
+    try:
+        with open(os.path.join(root, CACHE_FILE), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_stat_cache(cache, root="."):
+    path = os.path.join(root, CACHE_FILE)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w") as f:
+        json.dump(cache, f, separators=(",", ":"))
+    os.replace(path + ".tmp", path)
+
+def load_expected_hashes(root="."):
+    """
+    Collect expected artifact hashes from OMEGA_LOCK.json and the attestation chain.
+
+    Returns (omega_lock, expected, errors) where expected maps a file path to
+    its recorded SHA-256 and errors lists disagreements between the sources.
+    """
+    expected, errors = {}, []
+    with open(os.path.join(root, "OMEGA_LOCK.json"), "r") as f:
+        omega_lock = json.load(f)
+    for artifact in omega_lock.get("artifacts", {}).values():
+        if isinstance(artifact, dict) and artifact.get("filename") and artifact.get("sha256"):
+            expected[artifact["filename"]] = artifact["sha256"]
+    chain_path = os.path.join(root, "chain", "attestations.jsonl")
+    if omega_lock.get("omega_id") and os.path.exists(chain_path):
+        attestation = AttestationStore(chain_path).latest(omega_lock["omega_id"])
+        if attestation is None:
+            errors.append(f"No attestation found for omega_id {omega_lock['omega_id'][:16]}...")
+        else:
+            for artifact in attestation.get("artifacts", {}).values():
+                name, digest = artifact.get("name"), artifact.get("sha256")
+                if not name or not digest:
+                    continue
+                if expected.setdefault(name, digest) != digest:
+                    errors.append(f"OMEGA_LOCK.json and attestation disagree on {name}")
+    return omega_lock, expected, errors
+
+def hash_files(paths, root=".", cache=None, jobs=None):
+    """
+    Hash many files in parallel, reusing cached digests for unchanged files.
+
+    Returns {path: (sha256, size)} for existing files; missing files are
+    omitted. The cache dict is updated in place.
+    """
+    cache = {} if cache is None else cache
+    results, misses = {}, []
+    for path in paths:
+        try:
+            st = os.stat(os.path.join(root, path))
+        except FileNotFoundError:
+            cache.pop(path, None)
+            continue
+        hit = cache.get(path)
+        if hit and hit[:3] == _stat_key(st):
+            results[path] = (hit[3], st.st_size)
+        else:
+            misses.append((path, st))
+    started = time.time_ns()
+    # hashlib releases the GIL on large buffers, so threads hash on all cores
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as pool:
+        digests = pool.map(lambda item: compute_sha256(os.path.join(root, item[0])), misses)
+        for (path, st), digest in zip(misses, digests):
+            results[path] = (digest, st.st_size)
+            if st.st_mtime_ns < started - RACY_NS:
+                cache[path] = _stat_key(st) + [digest]
+            else:
+                cache.pop(path, None)
+    return results
+
+def run_verification(root=".", jobs=None, use_cache=True, write_summary=True):
+    """Verify all artifacts and return the verification results dict"""
     verification_results = {
         "verified": True,
         "timestamp": None,
         "files": []
     }
-    
-    # Check all required files exist
-    for filepath in required_files:
-        if not os.path.exists(filepath):
-            print(f"❌ Missing required file: {filepath}")
-            verification_results["verified"] = False
-            verification_results["files"].append({
-                "path": filepath,
-                "exists": False,
-                "error": "File not found"
-            })
-        else:
-            # Compute hash for existing files
-            file_hash = compute_sha256(filepath)
-            file_size = os.path.getsize(filepath)
-            
-            print(f"✓ {filepath}")
-            print(f"  SHA-256: {file_hash}")
-            print(f"  Size: {file_size} bytes")
-            
-            verification_results["files"].append({
-                "path": filepath,
-                "exists": True,
-                "sha256": file_hash,
-                "size": file_size
-            })
-    
-    # Verify OMEGA_LOCK.json is valid JSON
-    if os.path.exists("OMEGA_LOCK.json"):
+    expected = {}
+    if os.path.exists(os.path.join(root, "OMEGA_LOCK.json")):
         try:
-            with open("OMEGA_LOCK.json", "r") as f:
-                omega_data = json.load(f)
-            
-            # Verify it has the required omega_id field
+            omega_data, expected, errors = load_expected_hashes(root)
             if "omega_id" not in omega_data:
-                print("❌ OMEGA_LOCK.json missing omega_id field")
+                verification_results["errors"] = ["OMEGA_LOCK.json missing omega_id field"]
                 verification_results["verified"] = False
             else:
-                print(f"✓ OMEGA_ID: {omega_data['omega_id'][:16]}...")
                 verification_results["omega_id"] = omega_data["omega_id"]
-                
+            if errors:
+                verification_results.setdefault("errors", []).extend(errors)
+                verification_results["verified"] = False
         except json.JSONDecodeError as e:
-            print(f"❌ OMEGA_LOCK.json is not valid JSON: {e}")
+            verification_results["errors"] = [f"OMEGA_LOCK.json is not valid JSON: {e}"]
             verification_results["verified"] = False
-    
+
+    paths = list(dict.fromkeys(REQUIRED_FILES + sorted(expected)))
+    cache = load_stat_cache(root) if use_cache else {}
+    hashes = hash_files(paths, root, cache, jobs)
+    if use_cache:
+        save_stat_cache(cache, root)
+
+    for filepath in paths:
+        if filepath not in hashes:
+            verification_results["verified"] = False
+            verification_results["files"].append({
+                "path": filepath,
+                "exists": False,
+                "error": "File not found"
+            })
+            continue
+        file_hash, file_size = hashes[filepath]
+        entry = {
+            "path": filepath,
+            "exists": True,
+            "sha256": file_hash,
+            "size": file_size
+        }
+        if filepath in expected:
+            entry["expected_sha256"] = expected[filepath]
+            entry["match"] = file_hash == expected[filepath]
+            if not entry["match"]:
+                verification_results["verified"] = False
+        verification_results["files"].append(entry)
+
     # Load treasury and economy data if they exist
-    if os.path.exists("treasury_allocation.json"):
-        with open("treasury_allocation.json", "r") as f:
-            treasury = json.load(f)
+    for name, key in (("treasury_allocation.json", "treasury_verified"), ("economy_monetization.json", "economy_verified")):
+        if os.path.exists(os.path.join(root, name)):
+            with open(os.path.join(root, name), "r") as f:
+                json.load(f)
+            verification_results[key] = True
+
+    if write_summary:
+        os.makedirs(os.path.join(root, "artifacts"), exist_ok=True)
+        with open(os.path.join(root, "artifacts/verification_summary.json"), "w") as f:
+            json.dump(verification_results, f, indent=2)
+    return verification_results
+
+def report(verification_results):
+    """Print verification results"""
+    for error in verification_results.get("errors", []):
+        print(f"❌ {error}")
+    for entry in verification_results["files"]:
+        if not entry["exists"]:
+            print(f"❌ Missing required file: {entry['path']}")
+            continue
+        print(f"{'❌' if entry.get('match') is False else '✓'} {entry['path']}")
+        print(f"  SHA-256: {entry['sha256']}")
+        if entry.get("match") is False:
+            print(f"  Expected: {entry['expected_sha256']}")
+        print(f"  Size: {entry['size']} bytes")
+    if "omega_id" in verification_results:
+        print(f"✓ OMEGA_ID: {verification_results['omega_id'][:16]}...")
+    if verification_results.get("treasury_verified"):
         print(f"✓ Treasury allocation loaded")
-        verification_results["treasury_verified"] = True
-    
-    if os.path.exists("economy_monetization.json"):
-        with open("economy_monetization.json", "r") as f:
-            economy = json.load(f)
+    if verification_results.get("economy_verified"):
         print(f"✓ Economy monetization loaded")
-        verification_results["economy_verified"] = True
-    
-    # Write verification summary
-    os.makedirs("artifacts", exist_ok=True)
-    with open("artifacts/verification_summary.json", "w") as f:
-        json.dump(verification_results, f, indent=2)
-    
+
+def verify_artifacts(root=".", jobs=None, use_cache=True):
+    """Verify integrity of generated artifacts"""
+
+    print("🔐 Verifying Artifact Integrity...")
+
+    verification_results = run_verification(root, jobs, use_cache)
+    report(verification_results)
+
     if verification_results["verified"]:
         print("\n✅ All artifacts verified successfully")
         return 0
@@ -104,5 +222,33 @@ def verify_artifacts():
         print("\n❌ Verification failed - see errors above")
         return 1
 
+def watch(root=".", interval=2.0, jobs=None):
+    """Re-verify whenever an artifact's stat changes; runs until interrupted"""
+    print(f"👁  Watching artifacts every {interval}s (Ctrl-C to stop)...")
+    last = None
+    try:
+        while True:
+            results = run_verification(root, jobs)
+            state = (results["verified"], [(e["path"], e.get("sha256")) for e in results["files"]])
+            if state != last:
+                print(f"\n[{time.strftime('%Y-%m-%dT%H:%M:%S')}] {'✅ verified' if results['verified'] else '❌ FAILED'}")
+                report(results)
+                last = state
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        return 0 if last and last[0] else 1
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verify Codex Continuum build artifacts")
+    parser.add_argument("--root", default=".")
+    parser.add_argument("--jobs", type=int, default=None, help="hashing threads (default: all cores)")
+    parser.add_argument("--no-cache", action="store_true", help="re-hash every artifact")
+    parser.add_argument("--watch", nargs="?", type=float, const=2.0, default=None, metavar="SECONDS",
+                        help="keep running and re-verify on change")
+    args = parser.parse_args(argv)
+    if args.watch is not None:
+        return watch(args.root, args.watch, args.jobs)
+    return verify_artifacts(args.root, args.jobs, use_cache=not args.no_cache)
+
 if __name__ == "__main__":
-    exit(verify_artifacts())
+    exit(main())
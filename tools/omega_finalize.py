@@ -7,20 +7,69 @@ EUCELA Tri-License © 2025 Caleb Fedor Byker (Konev)
 
 import json
 import os
+import time
 import hashlib
 import zipfile
 import shutil
+from contextlib import contextmanager
 from datetime import datetime, timezone
 
+from attestation_store import AttestationStore
+
+CHUNK_SIZE = 1024 * 1024
+BUNDLE_NAME = "codex_omega_bundle.zip"
+BUNDLE_SKIP_DIRS = {'.git', 'node_modules', '__pycache__', '.github', 'releases', 'artifacts'}
+BUNDLE_SUFFIXES = ('.json', '.md', '.txt', '.py', '.js', '.sh')
+CHAIN_PATH = "chain/attestations.jsonl"
+# the store's index/tail sidecars are local caches, not release content
+BUNDLE_SKIP_FILES = {os.path.normpath(p) for p in AttestationStore.sidecars(CHAIN_PATH)}
+
+PHASE_TIMINGS = {}
+
+@contextmanager
+def phase(name):
+    """Record wall-clock time spent in a finalization phase"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        PHASE_TIMINGS[name] = time.perf_counter() - start
+
 def compute_sha256(filepath):
     """Compute SHA-256 hash of a file"""
     sha256_hash = hashlib.sha256()
     if os.path.exists(filepath):
         with open(filepath, "rb") as f:
-            for byte_block in iter(lambda: f.read(4096), b""):
+            for byte_block in iter(lambda: f.read(CHUNK_SIZE), b""):
                 sha256_hash.update(byte_block)
     return sha256_hash.hexdigest()
 
+class TeeHashWriter:
+    """
+    Write-only file wrapper that hashes every byte on its way to disk.
+
+    It deliberately has no seek()/tell(), so zipfile treats it as an
+    unseekable stream and writes the archive strictly front to back
+    (using data descriptors); the running digest is then exactly the
+    SHA-256 of the finished archive, with no second read.
+    """
+
+    def __init__(self, fileobj):
+        self._fileobj = fileobj
+        self._hash = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data):
+        self._hash.update(data)
+        self.size += len(data)
+        return self._fileobj.write(data)
+
+    def flush(self):
+        self._fileobj.flush()
+
+    def hexdigest(self):
+        return self._hash.hexdigest()
+
 def generate_omega_id():
     """Generate a unique Omega ID based on current timestamp and content"""
     timestamp = datetime.now(timezone.utc).isoformat()
@@ -53,36 +102,55 @@ def create_omega_lock():
     
     return omega_lock, omega_id
 
+def iter_bundle_files(root='.'):
+    """Yield the files that belong in the bundle, pruning skipped directories during the walk"""
+    for dirpath, dirs, files in os.walk(root):
+        dirs[:] = sorted(d for d in dirs if d not in BUNDLE_SKIP_DIRS)
+        for file in sorted(files):
+            path = os.path.join(dirpath, file)
+            if file.endswith(BUNDLE_SUFFIXES) and os.path.normpath(path) not in BUNDLE_SKIP_FILES:
+                yield path
+
 def create_bundle(omega_id):
-    """Create the codex_omega_bundle.zip"""
+    """
+    Create the codex_omega_bundle.zip in a single pass.
+
+    Each member is read once in 1 MiB chunks; every chunk is hashed and then
+    compressed into the archive, in this thread (SHA-256 runs far faster than
+    DEFLATE, so the single read is what matters). The archive bytes themselves
+    are hashed as they are written. The bundle is built under a temporary name
+    and renamed into place so existing hard links to an older bundle keep
+    pointing at the older bytes.
+    """
     
     print("📦 Creating codex_omega_bundle.zip...")
     
-    bundle_files = []
-    
-    # Collect files to include in bundle
-    for root, dirs, files in os.walk('.'):
-        # Skip certain directories
-        skip_dirs = {'.git', 'node_modules', '__pycache__', '.github', 'releases', 'artifacts'}
-        dirs[:] = [d for d in dirs if d not in skip_dirs]
-        
-        for file in files:
-            if file.endswith(('.json', '.md', '.txt', '.py', '.js', '.sh')):
-                filepath = os.path.join(root, file)
-                bundle_files.append(filepath)
-    
-    # Create the bundle
-    with zipfile.ZipFile("codex_omega_bundle.zip", "w", zipfile.ZIP_DEFLATED) as zipf:
-        for filepath in bundle_files:
-            zipf.write(filepath)
-    
-    bundle_size = os.path.getsize("codex_omega_bundle.zip")
-    bundle_hash = compute_sha256("codex_omega_bundle.zip")
-    
-    print(f"✓ Bundle created: {bundle_size} bytes")
+    tmp_path = BUNDLE_NAME + ".tmp"
+    member_hashes = {}
+    
+    with open(tmp_path, "wb") as raw:
+        tee = TeeHashWriter(raw)
+        with zipfile.ZipFile(tee, "w", zipfile.ZIP_DEFLATED) as zipf:
+            for filepath in iter_bundle_files('.'):
+                info = zipfile.ZipInfo.from_file(filepath)
+                info.compress_type = zipfile.ZIP_DEFLATED
+                member_hash = hashlib.sha256()
+                with open(filepath, "rb") as src, zipf.open(info, "w") as dst:
+                    for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+                        member_hash.update(chunk)
+                        dst.write(chunk)
+                member_hashes[info.filename] = member_hash.hexdigest()
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(tmp_path, BUNDLE_NAME)
+    
+    bundle_size = tee.size
+    bundle_hash = tee.hexdigest()
+    
+    print(f"✓ Bundle created: {bundle_size} bytes ({len(member_hashes)} files)")
     print(f"  SHA-256: {bundle_hash}")
     
-    return bundle_hash, bundle_size
+    return bundle_hash, bundle_size, member_hashes
 
 def create_capsule(omega_id):
     """Create codex_capsule.txt"""
@@ -120,10 +188,11 @@ All reproductions require attribution and verification.
 ═══════════════════════════════════════════════════════════════════════════════
 """
     
-    with open("codex_capsule.txt", "w") as f:
-        f.write(capsule_content.strip())
+    capsule_bytes = capsule_content.strip().encode("utf-8")
+    with open("codex_capsule.txt", "wb") as f:
+        f.write(capsule_bytes)
     
-    capsule_hash = compute_sha256("codex_capsule.txt")
+    capsule_hash = hashlib.sha256(capsule_bytes).hexdigest()
     print(f"✓ Capsule created")
     print(f"  SHA-256: {capsule_hash}")
     
@@ -153,14 +222,12 @@ def append_attestation(omega_id, bundle_hash, capsule_hash):
         "steward": "CFBK"
     }
     
-    # Ensure chain directory exists
-    os.makedirs("chain", exist_ok=True)
-    
-    # Append to attestations.jsonl (never overwrite)
-    with open("chain/attestations.jsonl", "a") as f:
-        f.write(json.dumps(attestation) + "\n")
+    # Append to attestations.jsonl (never overwrite), hash-linked and indexed
+    with AttestationStore(CHAIN_PATH) as store:
+        record = store.append(attestation)
     
     print("✓ Attestation recorded")
+    print(f"  Linked to: {record['prev_sha256'][:16]}...")
 
 def create_treasury_and_economy():
     """Create treasury_allocation.json and economy_monetization.json"""
@@ -223,48 +290,97 @@ def create_treasury_and_economy():
     
     print("✓ Treasury and economy files created")
 
+def publish_release(src, dst):
+    """
+    Place the bundle in releases/ without copying bytes where possible.
+
+    Tries a hard link first, then a kernel-side copy (copy_file_range, which
+    reflinks on CoW filesystems such as btrfs/XFS), then a plain copy.
+    Returns a short description of the method used.
+    """
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    if os.path.lexists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+        return "hard-linked"
+    except OSError:
+        pass
+    if hasattr(os, "copy_file_range"):
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                remaining = os.fstat(fsrc.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+            if remaining == 0:
+                shutil.copystat(src, dst)
+                return "reflinked/kernel-copied"
+        except OSError:
+            pass
+    shutil.copy2(src, dst)
+    return "copied"
+
 def finalize_omega():
     """Main finalization process"""
     
     print("🚀 Starting Omega Finalization Process...")
     print("=" * 80)
     
+    PHASE_TIMINGS.clear()
+    started = time.perf_counter()
+    
     # Step 1: Create OMEGA_LOCK structure
-    omega_lock, omega_id = create_omega_lock()
+    with phase("omega_lock"):
+        omega_lock, omega_id = create_omega_lock()
     
     # Step 2: Create bundle
-    bundle_hash, bundle_size = create_bundle(omega_id)
+    with phase("bundle"):
+        bundle_hash, bundle_size, member_hashes = create_bundle(omega_id)
     omega_lock["artifacts"]["bundle"] = {
         "filename": "codex_omega_bundle.zip",
         "sha256": bundle_hash,
-        "size": bundle_size
+        "size": bundle_size,
+        "members": member_hashes
     }
     
     # Step 3: Create capsule
-    capsule_hash = create_capsule(omega_id)
+    with phase("capsule"):
+        capsule_hash = create_capsule(omega_id)
     omega_lock["artifacts"]["capsule"] = {
         "filename": "codex_capsule.txt",
         "sha256": capsule_hash
     }
     
     # Step 4: Write OMEGA_LOCK.json
-    with open("OMEGA_LOCK.json", "w") as f:
-        json.dump(omega_lock, f, indent=2)
-    
-    omega_lock_hash = compute_sha256("OMEGA_LOCK.json")
+    with phase("write_lock"):
+        lock_bytes = json.dumps(omega_lock, indent=2).encode("utf-8")
+        with open("OMEGA_LOCK.json", "wb") as f:
+            f.write(lock_bytes)
+        omega_lock_hash = hashlib.sha256(lock_bytes).hexdigest()
     print(f"\n✓ OMEGA_LOCK.json created")
     print(f"  SHA-256: {omega_lock_hash}")
     
     # Step 5: Append attestation
-    append_attestation(omega_id, bundle_hash, capsule_hash)
+    with phase("attestation"):
+        append_attestation(omega_id, bundle_hash, capsule_hash)
     
     # Step 6: Create treasury and economy files
-    create_treasury_and_economy()
-    
-    # Step 7: Copy to releases
-    os.makedirs("releases", exist_ok=True)
-    shutil.copy("codex_omega_bundle.zip", "releases/codex_omega_bundle.zip")
-    print("✓ Bundle copied to releases/")
+    with phase("treasury_economy"):
+        create_treasury_and_economy()
+    
+    # Step 7: Publish to releases
+    with phase("release"):
+        method = publish_release(BUNDLE_NAME, os.path.join("releases", BUNDLE_NAME))
+    print(f"✓ Bundle {method} to releases/")
+    
+    total = time.perf_counter() - started
+    print("\n⏱  Phase timings:")
+    for name, seconds in PHASE_TIMINGS.items():
+        print(f"   {name:<18} {seconds * 1000:9.1f} ms")
+    print(f"   {'total':<18} {total * 1000:9.1f} ms")
     
     print("\n" + "=" * 80)
     print("✅ Omega Finalization Complete")